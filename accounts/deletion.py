@@ -0,0 +1,144 @@
+#accounts/deletion.py
+# Background account deletion in bounded chunks
+import time
+
+from django.core.files.storage import default_storage
+from django.db import router, transaction
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core import jobs
+from core.exports import delete_export_files
+from core.models import ExportJob
+from payments.models import TokenPurchase
+from .models import (
+    AccountDeletion, LoginAttempt, User, UserActivity, UserProfile,
+    UserVerification, VendorProfile,
+)
+
+
+CHUNK_SIZE = 1000
+
+
+def request_account_deletion(user, requested_by=None):
+    """
+    Deactivate the account immediately and queue the actual deletion
+    for the background worker. Safe to call more than once.
+    """
+    if user.is_active:
+        user.is_active = False
+        user.save(update_fields=['is_active'])
+    job, _ = AccountDeletion.objects.get_or_create(
+        user_id=user.pk,
+        defaults={'username': user.username, 'requested_by': requested_by},
+    )
+    return job
+
+
+def _raw_delete_chunk(model, pks):
+    # _raw_delete skips the collector: no objects are loaded and no cascades
+    # are followed, which is why dependents are removed leaf-first below.
+    with transaction.atomic(using=router.db_for_write(model)):
+        return model.objects.filter(pk__in=pks)._raw_delete(router.db_for_write(model))
+
+
+def _delete_files(model, field_name, pks):
+    deleted = 0
+    for name in model.objects.filter(pk__in=pks).values_list(field_name, flat=True):
+        if name:
+            default_storage.delete(name)
+            deleted += 1
+    return deleted
+
+
+class Stage:
+    """
+    One dependent table cleared for the account being deleted.
+    Rows are removed leaf-first, file_field media is deleted before the rows.
+    Files kept outside default_storage are removed by delete_files(pks),
+    which returns how many it deleted.
+    With nullify, the named foreign key is set to NULL instead of deleting.
+    """
+
+    def __init__(self, name, model, user_field='user', file_field=None, delete_files=None, nullify=None):
+        self.name = name
+        self.model = model
+        self.user_field = user_field
+        self.file_field = file_field
+        self.delete_files = delete_files
+        self.nullify = nullify
+
+    def queryset(self, user_id):
+        return self.model.objects.filter(**{f'{self.user_field}_id': user_id})
+
+    def run_chunk(self, user_id, chunk_size):
+        """Process one chunk; returns (rows_affected, files_deleted), (0, 0) when done"""
+        pks = list(self.queryset(user_id).order_by('pk').values_list('pk', flat=True)[:chunk_size])
+        if not pks:
+            return 0, 0
+        if self.nullify:
+            return self.model.objects.filter(pk__in=pks).update(**{self.nullify: None}), 0
+        files = 0
+        if self.file_field:
+            files = _delete_files(self.model, self.file_field, pks)
+        elif self.delete_files:
+            files = self.delete_files(pks)
+        return _raw_delete_chunk(self.model, pks), files
+
+
+STAGES = [
+    Stage('activities', UserActivity),
+    Stage('login_attempts', LoginAttempt),
+    Stage('export_jobs', ExportJob, user_field='created_by', delete_files=delete_export_files),
+    Stage('verification_reviews', UserVerification, user_field='verified_by', nullify='verified_by'),
+    Stage('verification_docs', UserVerification, file_field='document_file'),
+    Stage('token_purchases', TokenPurchase, user_field='vendor__user', nullify='vendor'),
+    Stage('vendor_profile', VendorProfile, file_field='shop_logo'),
+    Stage('user_profile', UserProfile, file_field='profile_image'),
+]
+
+
+def claim_next_job():
+    """Claim a pending or abandoned job for this worker, or return None"""
+    return jobs.claim_next_job(
+        AccountDeletion, 'requested_at', started_at=Coalesce('started_at', Value(timezone.now()))
+    )
+
+
+def process_account_deletion(job, chunk_size=CHUNK_SIZE, pause=0):
+    """
+    Run a claimed job to completion, resuming from its recorded stage.
+    Progress is saved after every chunk so a crashed worker loses at most one chunk.
+    """
+    names = [stage.name for stage in STAGES]
+    start = names.index(job.stage) if job.stage in names else 0
+
+    try:
+        for stage in STAGES[start:]:
+            job.stage = stage.name
+            while True:
+                rows, files = stage.run_chunk(job.user_id, chunk_size)
+                if not rows:
+                    break
+                job.progress[stage.name] = job.progress.get(stage.name, 0) + rows
+                job.files_deleted += files
+                job.heartbeat_at = timezone.now()
+                job.save(update_fields=['stage', 'progress', 'files_deleted', 'heartbeat_at'])
+                if pause:
+                    time.sleep(pause)
+
+        # Only a handful of rows (groups, permissions, admin log) remain,
+        # so the regular collector delete is cheap now
+        job.stage = 'user'
+        User.objects.filter(pk=job.user_id).delete()
+    except Exception as exc:
+        job.status = 'failed'
+        job.last_error = repr(exc)
+        job.save(update_fields=['stage', 'status', 'last_error', 'progress', 'files_deleted'])
+        raise
+
+    job.status = 'completed'
+    job.completed_at = timezone.now()
+    job.save(update_fields=['stage', 'status', 'completed_at'])
+    return job
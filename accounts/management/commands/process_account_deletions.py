@@ -0,0 +1,27 @@
+#accounts/management/commands/process_account_deletions.py
+from accounts.deletion import CHUNK_SIZE, claim_next_job, process_account_deletion
+from accounts.models import AccountDeletion
+from core.jobs import JobWorkerCommand
+
+
+class Command(JobWorkerCommand):
+    help = 'Background worker that deletes deactivated accounts in bounded chunks'
+    model = AccountDeletion
+    poll_interval = 30
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to sleep between chunks')
+
+    def claim(self):
+        return claim_next_job()
+
+    def run(self, job, **options):
+        process_account_deletion(job, chunk_size=options['chunk_size'], pause=options['pause'])
+
+    def started(self, job):
+        return f"Deleting account {job.username} (id {job.user_id}), resuming at '{job.stage or 'start'}'"
+
+    def finished(self, job):
+        return f"Done: {job.progress}, {job.files_deleted} files"
@@ -0,0 +1,79 @@
+#accounts/management/commands/user_agent_report.py
+# Storage and throughput comparison for the interned user agent / IP tables
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Sum
+from django.db.models.functions import Length
+
+from accounts.models import IPAddress, LoginAttempt, UserActivity, UserAgent
+
+
+# Bytes per foreign key column (BIGINT) once a row references the dimension tables
+FK_BYTES = 8
+
+
+class Command(BaseCommand):
+    help = 'Compare log table storage before and after user agent / IP interning, and measure id lookup throughput'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lookups', type=int, default=20000, help='Number of id lookups to time')
+
+    def handle(self, *args, **options):
+        self.report_storage()
+        self.report_throughput(options['lookups'])
+
+    def report_storage(self):
+        before = 0
+        rows = 0
+        for model in (LoginAttempt, UserActivity):
+            totals = model.objects.aggregate(
+                agent_bytes=Sum(Length('user_agent__raw')),
+                ip_bytes=Sum(Length('ip_address__address')),
+            )
+            count = model.objects.count()
+            rows += count
+            before += (totals['agent_bytes'] or 0) + (totals['ip_bytes'] or 0)
+            self.stdout.write(f"{model._meta.db_table}: {count} rows")
+
+        dimension = UserAgent.objects.aggregate(
+            raw=Sum(Length('raw')),
+            parsed=Sum(Length('browser') + Length('browser_version') + Length('os') + Length('os_version')),
+        )
+        dimension_bytes = (
+            (dimension['raw'] or 0) + (dimension['parsed'] or 0)
+            + UserAgent.objects.count() * 64
+            + (IPAddress.objects.aggregate(b=Sum(Length('address')))['b'] or 0)
+        )
+        after = rows * 2 * FK_BYTES + dimension_bytes
+
+        self.stdout.write(f"Distinct user agents: {UserAgent.objects.count()}, distinct IPs: {IPAddress.objects.count()}")
+        self.stdout.write(f"Inline strings (before): {before / 1024:.1f} KiB")
+        self.stdout.write(f"References + dimension tables (after): {after / 1024:.1f} KiB")
+        if before:
+            self.stdout.write(self.style.SUCCESS(f"Saved: {100 * (before - after) / before:.1f}%"))
+
+    def report_throughput(self, lookups):
+        samples = list(UserAgent.objects.values_list('raw', flat=True)[:500])
+        if not samples:
+            self.stdout.write('No user agents recorded yet; skipping throughput check')
+            return
+
+        manager = UserAgent.objects
+        manager.cache.clear()
+
+        start = time.perf_counter()
+        for i in range(lookups):
+            manager.cache.clear()
+            manager.get_id(samples[i % len(samples)])
+        uncached = lookups / (time.perf_counter() - start)
+
+        for raw in samples:
+            manager.get_id(raw)
+        start = time.perf_counter()
+        for i in range(lookups):
+            manager.get_id(samples[i % len(samples)])
+        cached = lookups / (time.perf_counter() - start)
+
+        self.stdout.write(f"Id lookups without cache: {uncached:,.0f}/s")
+        self.stdout.write(f"Id lookups with LRU cache: {cached:,.0f}/s ({manager.cache.hits} hits)")
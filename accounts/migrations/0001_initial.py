@@ -0,0 +1,236 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:10
+
+import accounts.models
+import django.contrib.auth.models
+import django.contrib.auth.validators
+import django.core.validators
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='User',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('password', models.CharField(max_length=128, verbose_name='password')),
+                ('last_login', models.DateTimeField(blank=True, null=True, verbose_name='last login')),
+                ('is_superuser', models.BooleanField(default=False, help_text='Designates that this user has all permissions without explicitly assigning them.', verbose_name='superuser status')),
+                ('username', models.CharField(error_messages={'unique': 'A user with that username already exists.'}, help_text='Required. 150 characters or fewer. Letters, digits and @/./+/-/_ only.', max_length=150, unique=True, validators=[django.contrib.auth.validators.UnicodeUsernameValidator()], verbose_name='username')),
+                ('first_name', models.CharField(blank=True, max_length=150, verbose_name='first name')),
+                ('last_name', models.CharField(blank=True, max_length=150, verbose_name='last name')),
+                ('email', models.EmailField(blank=True, max_length=254, verbose_name='email address')),
+                ('is_staff', models.BooleanField(default=False, help_text='Designates whether the user can log into this admin site.', verbose_name='staff status')),
+                ('is_active', models.BooleanField(default=True, help_text='Designates whether this user should be treated as active. Unselect this instead of deleting accounts.', verbose_name='active')),
+                ('date_joined', models.DateTimeField(default=django.utils.timezone.now, verbose_name='date joined')),
+                ('user_type', models.CharField(choices=[('buyer', 'Buyer'), ('vendor', 'Vendor'), ('admin', 'Admin')], default='buyer', max_length=10)),
+                ('phone_number', models.CharField(help_text='Format: +254XXXXXXXXX', max_length=15, unique=True, validators=[django.core.validators.RegexValidator(message='Enter valid Kenyan phone number', regex='^\\+?254[0-9]{9}$')])),
+                ('email_verified', models.BooleanField(default=False)),
+                ('phone_verified', models.BooleanField(default=False)),
+                ('verification_status', models.CharField(choices=[('pending', 'Pending'), ('verified', 'Verified'), ('rejected', 'Rejected'), ('suspended', 'Suspended')], default='pending', max_length=10)),
+                ('verification_date', models.DateTimeField(blank=True, null=True)),
+                ('trust_score', models.DecimalField(decimal_places=1, default=0.0, max_digits=3)),
+                ('last_active', models.DateTimeField(auto_now=True)),
+                ('is_active_buyer', models.BooleanField(default=True)),
+                ('is_active_vendor', models.BooleanField(default=False)),
+                ('accept_marketing', models.BooleanField(default=False)),
+                ('two_factor_enabled', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('groups', models.ManyToManyField(blank=True, help_text='The groups this user belongs to. A user will get all permissions granted to each of their groups.', related_name='user_set', related_query_name='user', to='auth.group', verbose_name='groups')),
+                ('user_permissions', models.ManyToManyField(blank=True, help_text='Specific permissions for this user.', related_name='user_set', related_query_name='user', to='auth.permission', verbose_name='user permissions')),
+            ],
+            options={
+                'db_table': 'accounts_user',
+            },
+            managers=[
+                ('objects', django.contrib.auth.models.UserManager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LoginAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email_or_username', models.CharField(max_length=255)),
+                ('ip_address', models.GenericIPAddressField()),
+                ('user_agent', models.TextField()),
+                ('success', models.BooleanField(default=False)),
+                ('timestamp', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'accounts_login_attempt',
+            },
+        ),
+        migrations.CreateModel(
+            name='UserActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('activity_type', models.CharField(choices=[('login', 'Login'), ('logout', 'Logout'), ('profile_update', 'Profile Update'), ('password_change', 'Password Change'), ('verification_submit', 'Verification Submitted'), ('product_view', 'Product Viewed'), ('shop_visit', 'Shop Visited'), ('search', 'Search Performed'), ('purchase', 'Purchase Made'), ('review_posted', 'Review Posted'), ('other', 'Other Activity')], max_length=20)),
+                ('description', models.CharField(blank=True, max_length=255)),
+                ('ip_address', models.GenericIPAddressField()),
+                ('user_agent', models.TextField(blank=True)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('timestamp', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activities', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'accounts_user_activity',
+                'ordering': ['-timestamp'],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('profile_image', models.ImageField(blank=True, help_text='Profile picture (max 2MB)', null=True, upload_to=accounts.models.user_profile_image_path)),
+                ('bio', models.TextField(blank=True, max_length=500)),
+                ('date_of_birth', models.DateField(blank=True, null=True)),
+                ('county', models.CharField(default='Nairobi', max_length=50)),
+                ('sub_county', models.CharField(blank=True, max_length=50)),
+                ('ward', models.CharField(blank=True, max_length=50)),
+                ('postal_address', models.CharField(blank=True, max_length=100)),
+                ('postal_code', models.CharField(blank=True, max_length=10)),
+                ('preferred_language', models.CharField(default='en', max_length=10)),
+                ('preferred_currency', models.CharField(default='KES', max_length=3)),
+                ('notification_preferences', models.JSONField(blank=True, default=dict)),
+                ('profile_visibility', models.CharField(choices=[('public', 'Public'), ('private', 'Private')], default='public', max_length=10)),
+                ('show_phone', models.BooleanField(default=False)),
+                ('show_email', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='profile', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'accounts_user_profile',
+            },
+        ),
+        migrations.CreateModel(
+            name='UserVerification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document_type', models.CharField(choices=[('national_id', 'National ID'), ('passport', 'Passport'), ('business_permit', 'Business Permit'), ('kra_pin', 'KRA PIN Certificate'), ('bank_statement', 'Bank Statement'), ('utility_bill', 'Utility Bill'), ('shop_photo', 'Shop Photo'), ('other', 'Other Document')], max_length=20)),
+                ('document_file', models.FileField(help_text='Upload clear photo/scan of document (max 5MB)', upload_to=accounts.models.verification_document_path)),
+                ('document_number', models.CharField(blank=True, max_length=50)),
+                ('submitted_at', models.DateTimeField(auto_now_add=True)),
+                ('verified_at', models.DateTimeField(blank=True, null=True)),
+                ('verification_notes', models.TextField(blank=True)),
+                ('is_approved', models.BooleanField(default=False)),
+                ('expiry_date', models.DateField(blank=True, null=True)),
+                ('is_primary', models.BooleanField(default=False)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='verification_docs', to=settings.AUTH_USER_MODEL)),
+                ('verified_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='verified_documents', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'accounts_user_verification',
+            },
+        ),
+        migrations.CreateModel(
+            name='VendorProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('business_name', models.CharField(max_length=200)),
+                ('business_registration_number', models.CharField(blank=True, max_length=50)),
+                ('business_type', models.CharField(choices=[('sole_proprietor', 'Sole Proprietor'), ('partnership', 'Partnership'), ('limited_company', 'Limited Company'), ('cooperative', 'Cooperative'), ('other', 'Other')], max_length=20)),
+                ('kra_pin', models.CharField(blank=True, max_length=11, validators=[django.core.validators.RegexValidator(message='Enter valid KRA PIN', regex='^[AP][0-9]{9}[A-Z]$')])),
+                ('shop_name', models.CharField(max_length=200)),
+                ('shop_description', models.TextField(max_length=1000)),
+                ('shop_category', models.CharField(choices=[('computers', 'Computers & Laptops'), ('mobile', 'Mobile Devices'), ('accessories', 'IT Accessories'), ('networking', 'Networking Equipment'), ('software', 'Software & Licenses'), ('repairs', 'Repair Services'), ('general', 'General Electronics')], max_length=20)),
+                ('shop_logo', models.ImageField(blank=True, help_text='Shop logo (recommended 200x200px)', null=True, upload_to='shop_logos/')),
+                ('physical_address', models.TextField(max_length=300)),
+                ('building_name', models.CharField(blank=True, max_length=100)),
+                ('floor_number', models.CharField(blank=True, max_length=10)),
+                ('shop_number', models.CharField(blank=True, max_length=20)),
+                ('landmark', models.CharField(blank=True, max_length=100)),
+                ('latitude', models.DecimalField(blank=True, decimal_places=8, max_digits=10, null=True)),
+                ('longitude', models.DecimalField(blank=True, decimal_places=8, max_digits=11, null=True)),
+                ('business_phone', models.CharField(max_length=15, validators=[django.core.validators.RegexValidator(regex='^\\+?254[0-9]{9}$')])),
+                ('business_email', models.EmailField(blank=True, max_length=254)),
+                ('whatsapp_number', models.CharField(blank=True, max_length=15, validators=[django.core.validators.RegexValidator(regex='^\\+?254[0-9]{9}$')])),
+                ('operating_hours', models.JSONField(default=dict, help_text='Store opening/closing times for each day')),
+                ('delivery_available', models.BooleanField(default=False)),
+                ('pickup_available', models.BooleanField(default=True)),
+                ('token_balance', models.PositiveIntegerField(default=0)),
+                ('total_tokens_purchased', models.PositiveIntegerField(default=0)),
+                ('total_tokens_used', models.PositiveIntegerField(default=0)),
+                ('total_sales', models.DecimalField(decimal_places=2, default=0.0, max_digits=12)),
+                ('total_orders', models.PositiveIntegerField(default=0)),
+                ('average_rating', models.DecimalField(decimal_places=2, default=0.0, max_digits=3)),
+                ('response_rate', models.DecimalField(decimal_places=2, default=0.0, max_digits=5)),
+                ('is_featured', models.BooleanField(default=False)),
+                ('is_premium', models.BooleanField(default=False)),
+                ('auto_approve_orders', models.BooleanField(default=False)),
+                ('shop_established_date', models.DateField(blank=True, null=True)),
+                ('joined_platform_date', models.DateTimeField(auto_now_add=True)),
+                ('last_token_purchase', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(limit_choices_to={'user_type': 'vendor'}, on_delete=django.db.models.deletion.CASCADE, related_name='vendor_profile', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'accounts_vendor_profile',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['user_type', 'verification_status'], name='accounts_us_user_ty_99c722_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['email', 'phone_number'], name='accounts_us_email_35f0e0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['created_at'], name='accounts_us_created_4734df_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loginattempt',
+            index=models.Index(fields=['ip_address', 'timestamp'], name='accounts_lo_ip_addr_ed66df_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loginattempt',
+            index=models.Index(fields=['user', 'success'], name='accounts_lo_user_id_bc3d04_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='useractivity',
+            index=models.Index(fields=['user', 'activity_type'], name='accounts_us_user_id_7e20ec_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='useractivity',
+            index=models.Index(fields=['timestamp'], name='accounts_us_timesta_986fd4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userverification',
+            index=models.Index(fields=['user', 'is_approved'], name='accounts_us_user_id_4c5908_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userverification',
+            index=models.Index(fields=['submitted_at'], name='accounts_us_submitt_f1f4ba_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='userverification',
+            unique_together={('user', 'document_type', 'document_number')},
+        ),
+        migrations.AddIndex(
+            model_name='vendorprofile',
+            index=models.Index(fields=['shop_category', 'is_featured'], name='accounts_ve_shop_ca_574e04_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vendorprofile',
+            index=models.Index(fields=['average_rating', 'total_orders'], name='accounts_ve_average_28d160_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vendorprofile',
+            index=models.Index(fields=['token_balance'], name='accounts_ve_token_b_d36a3d_idx'),
+        ),
+    ]
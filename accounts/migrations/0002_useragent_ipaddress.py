@@ -0,0 +1,86 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IPAddress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('address', models.GenericIPAddressField(unique=True)),
+                ('first_seen', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'accounts_ip_address',
+            },
+        ),
+        migrations.CreateModel(
+            name='UserAgent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ua_hash', models.CharField(help_text='SHA-256 of the raw string', max_length=64, unique=True)),
+                ('raw', models.TextField(blank=True)),
+                ('browser', models.CharField(max_length=50)),
+                ('browser_version', models.CharField(blank=True, max_length=50)),
+                ('os', models.CharField(max_length=50)),
+                ('os_version', models.CharField(blank=True, max_length=50)),
+                ('device_type', models.CharField(choices=[('desktop', 'Desktop'), ('mobile', 'Mobile'), ('tablet', 'Tablet'), ('bot', 'Bot'), ('unknown', 'Unknown')], default='unknown', max_length=10)),
+                ('first_seen', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'accounts_user_agent',
+                'indexes': [models.Index(fields=['browser', 'os'], name='accounts_us_browser_12efcf_idx'), models.Index(fields=['device_type'], name='accounts_us_device__ec09d1_idx')],
+            },
+        ),
+        # Nullable reference columns are added next to the raw text columns
+        # so the backfill in 0003 can run in chunks against a live table.
+        # The raw columns are relaxed to nullable so 0004 can be reversed.
+        migrations.AlterField(
+            model_name='loginattempt',
+            name='ip_address',
+            field=models.GenericIPAddressField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='loginattempt',
+            name='user_agent',
+            field=models.TextField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='useractivity',
+            name='ip_address',
+            field=models.GenericIPAddressField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='useractivity',
+            name='user_agent',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='loginattempt',
+            name='ip_address_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.ipaddress'),
+        ),
+        migrations.AddField(
+            model_name='loginattempt',
+            name='user_agent_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.useragent'),
+        ),
+        migrations.AddField(
+            model_name='useractivity',
+            name='ip_address_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.ipaddress'),
+        ),
+        migrations.AddField(
+            model_name='useractivity',
+            name='user_agent_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.useragent'),
+        ),
+    ]
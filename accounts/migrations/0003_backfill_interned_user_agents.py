@@ -0,0 +1,106 @@
+# Backfills the interned user agent / IP references in bounded chunks.
+# Runs non-atomically so every chunk commits on its own and an interrupted
+# run picks up where it stopped (rows with ip_address_ref set are skipped).
+
+from django.db import migrations, transaction
+
+from accounts.user_agents import parse_user_agent, user_agent_hash
+
+
+BATCH_SIZE = 2000
+
+
+def _intern(model, key_field, keys, defaults_for):
+    """Return {key: id} for keys, creating the missing dimension rows"""
+    found = dict(model.objects.filter(**{f'{key_field}__in': keys}).values_list(key_field, 'id'))
+    missing = [key for key in keys if key not in found]
+    if missing:
+        model.objects.bulk_create(
+            [model(**{key_field: key}, **defaults_for(key)) for key in missing],
+            ignore_conflicts=True,
+        )
+        found.update(model.objects.filter(**{f'{key_field}__in': missing}).values_list(key_field, 'id'))
+    return found
+
+
+def backfill_model(apps, model_name):
+    Model = apps.get_model('accounts', model_name)
+    UserAgent = apps.get_model('accounts', 'UserAgent')
+    IPAddress = apps.get_model('accounts', 'IPAddress')
+
+    agent_ids = {}
+    ip_ids = {}
+    last_pk = 0
+    while True:
+        rows = list(
+            Model.objects.filter(pk__gt=last_pk, ip_address_ref__isnull=True)
+            .order_by('pk')
+            .values_list('pk', 'ip_address', 'user_agent')[:BATCH_SIZE]
+        )
+        if not rows:
+            break
+
+        raw_by_hash = {user_agent_hash(raw): raw for _, _, raw in rows if raw and raw not in agent_ids}
+        if raw_by_hash:
+            ids = _intern(
+                UserAgent, 'ua_hash', list(raw_by_hash),
+                lambda key: {'raw': raw_by_hash[key], **parse_user_agent(raw_by_hash[key])},
+            )
+            agent_ids.update({raw_by_hash[key]: pk for key, pk in ids.items()})
+
+        new_ips = list({ip for _, ip, _ in rows if ip not in ip_ids})
+        if new_ips:
+            ip_ids.update(_intern(IPAddress, 'address', new_ips, lambda key: {}))
+
+        objs = []
+        for pk, ip, raw in rows:
+            obj = Model(pk=pk)
+            obj.ip_address_ref_id = ip_ids[ip]
+            # A blank user agent is stored as NULL rather than interned
+            obj.user_agent_ref_id = agent_ids[raw] if raw else None
+            objs.append(obj)
+        with transaction.atomic():
+            Model.objects.bulk_update(objs, ['ip_address_ref', 'user_agent_ref'], batch_size=500)
+
+        last_pk = rows[-1][0]
+        # Keep the per-run caches bounded on very diverse tables
+        if len(agent_ids) > 50000:
+            agent_ids.clear()
+        if len(ip_ids) > 50000:
+            ip_ids.clear()
+
+
+def backfill(apps, schema_editor):
+    backfill_model(apps, 'LoginAttempt')
+    backfill_model(apps, 'UserActivity')
+
+
+def restore_raw_values(apps, schema_editor):
+    for model_name in ('LoginAttempt', 'UserActivity'):
+        Model = apps.get_model('accounts', model_name)
+        last_pk = 0
+        while True:
+            rows = list(
+                Model.objects.filter(pk__gt=last_pk, ip_address_ref__isnull=False)
+                .order_by('pk')
+                .values_list('pk', 'ip_address_ref__address', 'user_agent_ref__raw')[:BATCH_SIZE]
+            )
+            if not rows:
+                break
+            objs = [Model(pk=pk, ip_address=ip, user_agent=raw or '') for pk, ip, raw in rows]
+            with transaction.atomic():
+                Model.objects.bulk_update(objs, ['ip_address', 'user_agent'], batch_size=500)
+            last_pk = rows[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0002_useragent_ipaddress'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, restore_raw_values, elidable=True),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_backfill_interned_user_agents'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='loginattempt',
+            name='accounts_lo_ip_addr_ed66df_idx',
+        ),
+        migrations.RemoveField(
+            model_name='loginattempt',
+            name='ip_address',
+        ),
+        migrations.RemoveField(
+            model_name='loginattempt',
+            name='user_agent',
+        ),
+        migrations.RemoveField(
+            model_name='useractivity',
+            name='ip_address',
+        ),
+        migrations.RemoveField(
+            model_name='useractivity',
+            name='user_agent',
+        ),
+        migrations.RenameField(
+            model_name='loginattempt',
+            old_name='ip_address_ref',
+            new_name='ip_address',
+        ),
+        migrations.RenameField(
+            model_name='loginattempt',
+            old_name='user_agent_ref',
+            new_name='user_agent',
+        ),
+        migrations.RenameField(
+            model_name='useractivity',
+            old_name='ip_address_ref',
+            new_name='ip_address',
+        ),
+        migrations.RenameField(
+            model_name='useractivity',
+            old_name='user_agent_ref',
+            new_name='user_agent',
+        ),
+        migrations.AlterField(
+            model_name='loginattempt',
+            name='ip_address',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='login_attempts', to='accounts.ipaddress'),
+        ),
+        migrations.AlterField(
+            model_name='loginattempt',
+            name='user_agent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='login_attempts', to='accounts.useragent'),
+        ),
+        migrations.AlterField(
+            model_name='useractivity',
+            name='ip_address',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='activities', to='accounts.ipaddress'),
+        ),
+        migrations.AlterField(
+            model_name='useractivity',
+            name='user_agent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='activities', to='accounts.useragent'),
+        ),
+        migrations.AddIndex(
+            model_name='loginattempt',
+            index=models.Index(fields=['ip_address', 'timestamp'], name='accounts_lo_ip_addr_d0b936_idx'),
+        ),
+    ]
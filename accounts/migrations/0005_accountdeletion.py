@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_drop_raw_user_agents'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountDeletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.BigIntegerField(unique=True)),
+                ('username', models.CharField(max_length=150)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('stage', models.CharField(blank=True, max_length=30)),
+                ('progress', models.JSONField(blank=True, default=dict, help_text='Rows removed per stage')),
+                ('files_deleted', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('requested_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='requested_deletions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'accounts_account_deletion',
+                'indexes': [models.Index(fields=['status', 'requested_at'], name='accounts_ac_status_47ea21_idx')],
+            },
+        ),
+    ]
@@ -1,5 +1,5 @@
 #accounts/models.py
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import RegexValidator, MinLengthValidator
 from django.utils import timezone
@@ -7,6 +7,9 @@ from PIL import Image
 import uuid
 import os
 
+from core.cache import LRUCache
+from .user_agents import parse_user_agent, user_agent_hash
+
 
 def user_profile_image_path(instance, filename):
     """Generate file path for user profile images"""
@@ -340,17 +343,130 @@ class VendorProfile(models.Model):
         return self.average_rating >= 4.5 and self.total_orders >= 50
 
 
+class InternManager(models.Manager):
+    """
+    Manager for dimension tables that store each distinct string once.
+    Maps a raw value to its row id through an in-process LRU so repeated
+    inserts of the same value don't need a lookup round trip.
+    """
+    cache = None
+
+    def intern_lookup(self, value):
+        """Return (lookup, defaults) used to get_or_create the row for value"""
+        raise NotImplementedError
+
+    def get_id(self, value):
+        if not value:
+            raise ValueError(f"Cannot intern an empty {self.model._meta.verbose_name}")
+        row_id = self.cache.get(value)
+        if row_id is None:
+            lookup, defaults = self.intern_lookup(value)
+            row, _ = self.get_or_create(defaults=defaults, **lookup)
+            row_id = row.pk
+            # Only cache ids that are committed, so a rolled back insert
+            # can never leave a dangling id behind in the cache
+            transaction.on_commit(lambda: self.cache.set(value, row_id), using=self.db)
+        return row_id
+
+
+class UserAgentManager(InternManager):
+    cache = LRUCache(maxsize=4096)
+
+    def intern_lookup(self, value):
+        return {'ua_hash': user_agent_hash(value)}, {'raw': value, **parse_user_agent(value)}
+
+
+class IPAddressManager(InternManager):
+    cache = LRUCache(maxsize=16384)
+
+    def intern_lookup(self, value):
+        return {'address': value}, {}
+
+
+class UserAgent(models.Model):
+    """
+    Interned user-agent strings shared by LoginAttempt and UserActivity
+    """
+    DEVICE_TYPE_CHOICES = [
+        ('desktop', 'Desktop'),
+        ('mobile', 'Mobile'),
+        ('tablet', 'Tablet'),
+        ('bot', 'Bot'),
+        ('unknown', 'Unknown'),
+    ]
+
+    ua_hash = models.CharField(max_length=64, unique=True, help_text='SHA-256 of the raw string')
+    raw = models.TextField(blank=True)
+
+    # Parsed Details
+    browser = models.CharField(max_length=50)
+    browser_version = models.CharField(max_length=50, blank=True)
+    os = models.CharField(max_length=50)
+    os_version = models.CharField(max_length=50, blank=True)
+    device_type = models.CharField(max_length=10, choices=DEVICE_TYPE_CHOICES, default='unknown')
+
+    first_seen = models.DateTimeField(auto_now_add=True)
+
+    objects = UserAgentManager()
+
+    class Meta:
+        db_table = 'accounts_user_agent'
+        indexes = [
+            models.Index(fields=['browser', 'os']),
+            models.Index(fields=['device_type']),
+        ]
+
+    def __str__(self):
+        return f"{self.browser} {self.browser_version} on {self.os} ({self.device_type})"
+
+
+class IPAddress(models.Model):
+    """
+    Interned client IP addresses shared by LoginAttempt and UserActivity
+    """
+    address = models.GenericIPAddressField(unique=True)
+    first_seen = models.DateTimeField(auto_now_add=True)
+
+    objects = IPAddressManager()
+
+    class Meta:
+        db_table = 'accounts_ip_address'
+
+    def __str__(self):
+        return self.address
+
+
+class LoginAttemptManager(models.Manager):
+    def record(self, email_or_username, ip_address, user_agent='', success=False, user=None):
+        """Insert a login attempt, resolving the interned IP and user agent ids"""
+        return self.create(
+            user=user,
+            email_or_username=email_or_username,
+            ip_address_id=IPAddress.objects.get_id(ip_address),
+            user_agent_id=UserAgent.objects.get_id(user_agent) if user_agent else None,
+            success=success,
+        )
+
+
 class LoginAttempt(models.Model):
     """
     Track login attempts for security monitoring
     """
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
     email_or_username = models.CharField(max_length=255)
-    ip_address = models.GenericIPAddressField()
-    user_agent = models.TextField()
+    ip_address = models.ForeignKey(IPAddress, on_delete=models.PROTECT, related_name='login_attempts')
+    user_agent = models.ForeignKey(
+        UserAgent,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='login_attempts'
+    )
     success = models.BooleanField(default=False)
     timestamp = models.DateTimeField(auto_now_add=True)
     
+    objects = LoginAttemptManager()
+
     class Meta:
         db_table = 'accounts_login_attempt'
         indexes = [
@@ -363,6 +479,19 @@ class LoginAttempt(models.Model):
         return f"{self.email_or_username} - {status} at {self.timestamp}"
 
 
+class UserActivityManager(models.Manager):
+    def record(self, user, activity_type, ip_address, user_agent='', description='', metadata=None):
+        """Insert an activity row, resolving the interned IP and user agent ids"""
+        return self.create(
+            user=user,
+            activity_type=activity_type,
+            description=description,
+            ip_address_id=IPAddress.objects.get_id(ip_address),
+            user_agent_id=UserAgent.objects.get_id(user_agent) if user_agent else None,
+            metadata=metadata or {},
+        )
+
+
 class UserActivity(models.Model):
     """
     Track user activity for analytics and security
@@ -384,11 +513,19 @@ class UserActivity(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='activities')
     activity_type = models.CharField(max_length=20, choices=ACTIVITY_TYPE_CHOICES)
     description = models.CharField(max_length=255, blank=True)
-    ip_address = models.GenericIPAddressField()
-    user_agent = models.TextField(blank=True)
+    ip_address = models.ForeignKey(IPAddress, on_delete=models.PROTECT, related_name='activities')
+    user_agent = models.ForeignKey(
+        UserAgent,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='activities'
+    )
     metadata = models.JSONField(default=dict, blank=True)
     timestamp = models.DateTimeField(auto_now_add=True)
     
+    objects = UserActivityManager()
+
     class Meta:
         db_table = 'accounts_user_activity'
         indexes = [
@@ -401,6 +538,50 @@ class UserActivity(models.Model):
         return f"{self.user.username} - {self.get_activity_type_display()}"
 
 
+class AccountDeletion(models.Model):
+    """
+    Background deletion job for a deactivated account.
+    Keeps the user id as a plain column so the record outlives the user.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    user_id = models.BigIntegerField(unique=True)
+    username = models.CharField(max_length=150)
+    requested_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='requested_deletions'
+    )
+
+    # Progress Tracking
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    stage = models.CharField(max_length=30, blank=True)
+    progress = models.JSONField(default=dict, blank=True, help_text='Rows removed per stage')
+    files_deleted = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    requested_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'accounts_account_deletion'
+        indexes = [
+            models.Index(fields=['status', 'requested_at']),
+        ]
+
+    def __str__(self):
+        return f"Delete {self.username} ({self.get_status_display()})"
+
+
 # Signal handlers for automatic profile creation
 from django.db.models.signals import post_save
 from django.dispatch import receiver
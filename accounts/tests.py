@@ -1,3 +1,269 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+
+from core.exports import export_path, queue_export, run_export_job
+from payments.models import TokenPurchase
+from vendors.exports import VendorActivityExport
+from . import deletion
+from .deletion import claim_next_job, process_account_deletion, request_account_deletion
+from .models import (
+    AccountDeletion, IPAddress, LoginAttempt, User, UserActivity, UserAgent, UserProfile,
+    UserVerification, VendorProfile,
+)
+from .user_agents import parse_user_agent, user_agent_hash
+
+
+CHROME_WINDOWS = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
+CUBOT_ANDROID = (
+    'Mozilla/5.0 (Linux; Android 9; CUBOT P30 Build/PPR1.180610.011) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/92.0.4515.131 Mobile Safari/537.36'
+)
+
+
+class ParseUserAgentTests(SimpleTestCase):
+    def test_desktop_browser(self):
+        self.assertEqual(parse_user_agent(CHROME_WINDOWS), {
+            'browser': 'Chrome', 'browser_version': '120.0.0.0',
+            'os': 'Windows', 'os_version': '10.0', 'device_type': 'desktop',
+        })
+
+    def test_handset_named_like_a_bot_is_mobile(self):
+        fields = parse_user_agent(CUBOT_ANDROID)
+        self.assertEqual((fields['os'], fields['os_version'], fields['device_type']), ('Android', '9', 'mobile'))
+
+    def test_specific_browsers_win_over_chrome(self):
+        edge = CHROME_WINDOWS + ' Edg/120.0.2210.91'
+        self.assertEqual(parse_user_agent(edge)['browser'], 'Edge')
+        iphone = (
+            'Mozilla/5.0 (iPhone; CPU iPhone OS 17_1 like Mac OS X) AppleWebKit/605.1.15 '
+            '(KHTML, like Gecko) Version/17.1 Mobile/15E148 Safari/604.1'
+        )
+        self.assertEqual(parse_user_agent(iphone), {
+            'browser': 'Safari', 'browser_version': '17.1',
+            'os': 'iOS', 'os_version': '17.1', 'device_type': 'mobile',
+        })
+
+    def test_android_without_mobile_is_tablet(self):
+        tablet = CUBOT_ANDROID.replace(' Mobile', '')
+        self.assertEqual(parse_user_agent(tablet)['device_type'], 'tablet')
+
+    def test_crawlers_and_clients(self):
+        for raw in [
+            'Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)',
+            'Mozilla/5.0 AppleWebKit/537.36 (KHTML, like Gecko; compatible; bingbot/2.0; '
+            '+http://www.bing.com/bingbot.htm) Chrome/116.0.1938.76 Safari/537.36',
+            'Twitterbot/1.0',
+            'facebookexternalhit/1.1',
+            'curl/8.4.0',
+            'python-requests/2.31.0',
+        ]:
+            with self.subTest(raw=raw):
+                self.assertEqual(parse_user_agent(raw)['device_type'], 'bot')
+
+    def test_blank(self):
+        self.assertEqual(parse_user_agent('')['device_type'], 'unknown')
+
+
+class InternManagerTests(TestCase):
+    def setUp(self):
+        UserAgent.objects.cache.clear()
+        IPAddress.objects.cache.clear()
+
+    def test_id_cached_only_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            agent_id = UserAgent.objects.get_id(CHROME_WINDOWS)
+        self.assertIsNone(UserAgent.objects.cache.get(CHROME_WINDOWS))
+        for callback in callbacks:
+            callback()
+        self.assertEqual(UserAgent.objects.cache.get(CHROME_WINDOWS), agent_id)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(UserAgent.objects.get_id(CHROME_WINDOWS), agent_id)
+
+    def test_rolled_back_insert_is_not_cached(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    IPAddress.objects.get_id('10.0.0.1')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertIsNone(IPAddress.objects.cache.get('10.0.0.1'))
+        self.assertFalse(IPAddress.objects.filter(address='10.0.0.1').exists())
+
+    def test_same_value_shares_one_row(self):
+        first = IPAddress.objects.get_id('10.0.0.2')
+        self.assertEqual(IPAddress.objects.get_id('10.0.0.2'), first)
+        self.assertEqual(IPAddress.objects.count(), 1)
+
+    def test_empty_values_are_rejected(self):
+        for value in (None, ''):
+            with self.assertRaises(ValueError):
+                IPAddress.objects.get_id(value)
+
+    def test_blank_user_agent_is_null_for_both_logs(self):
+        attempt = LoginAttempt.objects.record('someone', '10.0.0.3', user_agent='')
+        self.assertIsNone(attempt.user_agent_id)
+        user = User.objects.create(username='someone', email='someone@example.com', phone_number='+254700000001')
+        activity = UserActivity.objects.record(user, 'login', '10.0.0.3', user_agent='')
+        self.assertIsNone(activity.user_agent_id)
+        self.assertFalse(UserAgent.objects.exists())
+
+
+class UserAgentBackfillTests(TransactionTestCase):
+    """0003 moves raw strings into the interned tables, blank agents to NULL"""
+
+    migrate_from = [('accounts', '0002_useragent_ipaddress')]
+    migrate_to = [('accounts', '0003_backfill_interned_user_agents')]
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_from)
+        self.addCleanup(self.migrate_to_latest)
+
+    def migrate_to_latest(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_backfill(self):
+        executor = MigrationExecutor(connection)
+        old_apps = executor.loader.project_state(self.migrate_from).apps
+        OldLoginAttempt = old_apps.get_model('accounts', 'LoginAttempt')
+        OldLoginAttempt.objects.bulk_create([
+            OldLoginAttempt(email_or_username='a', ip_address='10.0.0.1', user_agent=CHROME_WINDOWS),
+            OldLoginAttempt(email_or_username='b', ip_address='10.0.0.1', user_agent=CHROME_WINDOWS),
+            OldLoginAttempt(email_or_username='c', ip_address='10.0.0.2', user_agent=''),
+        ])
+
+        executor.loader.build_graph()
+        executor.migrate(self.migrate_to)
+        new_apps = executor.loader.project_state(self.migrate_to).apps
+        LoginAttempt = new_apps.get_model('accounts', 'LoginAttempt')
+        UserAgent = new_apps.get_model('accounts', 'UserAgent')
+
+        rows = list(
+            LoginAttempt.objects.order_by('email_or_username')
+            .values_list('ip_address_ref__address', 'user_agent_ref__ua_hash')
+        )
+        self.assertEqual(rows, [
+            ('10.0.0.1', user_agent_hash(CHROME_WINDOWS)),
+            ('10.0.0.1', user_agent_hash(CHROME_WINDOWS)),
+            ('10.0.0.2', None),
+        ])
+        self.assertEqual(UserAgent.objects.get().browser, 'Chrome')
+
+
+class AccountDeletionTests(TestCase):
+    """Chunked raw deletes must leave no dangling rows, files or references"""
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        settings_override = override_settings(MEDIA_ROOT=media, EXPORT_ROOT=media + '/exports')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.vendor = User.objects.create(
+            username='vendor', email='vendor@example.com', phone_number='+254700000010', user_type='vendor'
+        )
+        self.other = User.objects.create(username='other', email='other@example.com', phone_number='+254700000011')
+        for i in range(3):
+            LoginAttempt.objects.record('vendor', f'10.0.0.{i}', success=True, user=self.vendor)
+            UserActivity.objects.record(self.vendor, 'login', f'10.0.0.{i}', user_agent='Mozilla/5.0')
+        for user in (self.vendor, self.other):
+            UserVerification.objects.create(
+                user=user,
+                document_type='national_id',
+                document_file=ContentFile(b'scan', name=f'{user.username}.pdf'),
+                verified_by=self.vendor,
+            )
+        self.files = list(UserVerification.objects.filter(user=self.vendor).values_list('document_file', flat=True))
+        self.purchase = TokenPurchase.objects.create(
+            vendor=self.vendor.vendor_profile, tokens=10, amount=Decimal('100'),
+            phone_number='+254700000010', checkout_request_id='ws_CO_1',
+        )
+
+    def run_job(self, chunk_size=2):
+        job = claim_next_job()
+        return process_account_deletion(job, chunk_size=chunk_size)
+
+    def test_deletes_leaf_first_and_keeps_references_valid(self):
+        request_account_deletion(self.vendor)
+        job = self.run_job()
+        # Deferred FK constraints are checked here; a parent deleted before
+        # its children would raise IntegrityError
+        connection.check_constraints()
+
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.progress, {
+            'activities': 3, 'login_attempts': 3, 'verification_reviews': 2,
+            'verification_docs': 1, 'token_purchases': 1, 'vendor_profile': 1, 'user_profile': 1,
+        })
+        self.assertFalse(User.objects.filter(pk=self.vendor.pk).exists())
+        self.assertFalse(VendorProfile.objects.filter(user_id=self.vendor.pk).exists())
+        self.assertFalse(UserProfile.objects.filter(user_id=self.vendor.pk).exists())
+
+    def test_references_are_nulled_not_deleted(self):
+        request_account_deletion(self.vendor)
+        self.run_job()
+
+        review = UserVerification.objects.get(user=self.other)
+        self.assertIsNone(review.verified_by_id)
+        self.purchase.refresh_from_db()
+        self.assertIsNone(self.purchase.vendor_id)
+
+    def test_document_and_export_files_removed(self):
+        export_job = queue_export(VendorActivityExport(user_id=self.vendor.pk), self.vendor)
+        run_export_job(export_job)
+        self.assertTrue(os.path.exists(export_path(export_job)))
+
+        request_account_deletion(self.vendor)
+        job = self.run_job()
+        self.assertEqual(job.files_deleted, 2)
+        self.assertEqual(job.progress['export_jobs'], 1)
+        self.assertFalse(os.path.exists(export_path(export_job)))
+        for name in self.files:
+            self.assertFalse(default_storage.exists(name))
+        self.assertTrue(default_storage.exists(UserVerification.objects.get(user=self.other).document_file.name))
+
+    def test_resumes_from_recorded_stage_after_failure(self):
+        request_account_deletion(self.vendor)
+        real_chunk = deletion._raw_delete_chunk
+        calls = []
+
+        def fail_on_second_login_chunk(model, pks):
+            if model is LoginAttempt:
+                calls.append(pks)
+                if len(calls) == 2:
+                    raise RuntimeError('connection lost')
+            return real_chunk(model, pks)
+
+        with mock.patch.object(deletion, '_raw_delete_chunk', fail_on_second_login_chunk):
+            with self.assertRaises(RuntimeError):
+                self.run_job()
+
+        job = AccountDeletion.objects.get()
+        self.assertEqual((job.status, job.stage), ('failed', 'login_attempts'))
+        self.assertEqual(job.progress, {'activities': 3, 'login_attempts': 2})
+        self.assertEqual(LoginAttempt.objects.filter(user=self.vendor).count(), 1)
+
+        AccountDeletion.objects.update(status='pending')
+        with mock.patch.object(deletion.STAGES[0], 'run_chunk', side_effect=AssertionError('stage repeated')):
+            job = self.run_job()
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.progress['login_attempts'], 3)
+        self.assertFalse(User.objects.filter(pk=self.vendor.pk).exists())
 
-# Create your tests here.
@@ -0,0 +1,80 @@
+#accounts/user_agents.py
+# Lightweight user-agent parsing for the interned UserAgent dimension table
+import hashlib
+import re
+
+
+# Order matters: more specific tokens must be checked before generic ones
+# (Edge and Opera both also advertise Chrome, Chrome also advertises Safari).
+BROWSER_PATTERNS = [
+    ('Edge', re.compile(r'Edg(?:e|A|iOS)?/([\d.]+)')),
+    ('Opera', re.compile(r'(?:OPR|Opera)/([\d.]+)')),
+    ('Samsung Internet', re.compile(r'SamsungBrowser/([\d.]+)')),
+    ('UC Browser', re.compile(r'UCBrowser/([\d.]+)')),
+    ('Firefox', re.compile(r'(?:Firefox|FxiOS)/([\d.]+)')),
+    ('Chrome', re.compile(r'(?:Chrome|CriOS)/([\d.]+)')),
+    ('Safari', re.compile(r'Version/([\d.]+).*Safari/')),
+    ('Internet Explorer', re.compile(r'(?:MSIE |Trident/.*rv:)([\d.]+)')),
+]
+
+OS_PATTERNS = [
+    ('Windows', re.compile(r'Windows NT ([\d.]+)')),
+    ('Android', re.compile(r'Android ([\d.]+)')),
+    ('iOS', re.compile(r'(?:iPhone|iPad|iPod).*? OS ([\d_]+)')),
+    ('macOS', re.compile(r'Mac OS X ([\d_.]+)')),
+    ('Chrome OS', re.compile(r'CrOS \S+ ([\d.]+)')),
+    ('Linux', re.compile(r'Linux()')),
+]
+
+# Crawlers name themselves as "<name>bot/<version>" or "compatible; <name>bot"
+# and usually link an info page; a bare "bot" would also match handsets
+# such as CUBOT
+BOT_PATTERN = re.compile(
+    r'\w*bot/\d|compatible;\s*\w*bot\b|\+https?://|crawl|spider|slurp|facebookexternalhit'
+    r'|^(?:curl|wget|python-requests|[\w.-]*httpclient)\b',
+    re.IGNORECASE,
+)
+TABLET_PATTERN = re.compile(r'iPad|Tablet', re.IGNORECASE)
+MOBILE_PATTERN = re.compile(r'Mobi|iPhone|iPod|Android|Opera Mini|KaiOS', re.IGNORECASE)
+
+
+def user_agent_hash(raw):
+    """Return the fixed-length digest used as the unique key for a raw user-agent string"""
+    return hashlib.sha256((raw or '').encode('utf-8')).hexdigest()
+
+
+def _match(patterns, raw):
+    for name, pattern in patterns:
+        match = pattern.search(raw)
+        if match:
+            return name, match.group(1).replace('_', '.')
+    return 'Other', ''
+
+
+def parse_user_agent(raw):
+    """
+    Split a raw user-agent string into browser, OS and device fields.
+    Returns a dict ready to be passed to UserAgent(**fields).
+    """
+    raw = raw or ''
+    browser, browser_version = _match(BROWSER_PATTERNS, raw)
+    os_name, os_version = _match(OS_PATTERNS, raw)
+
+    if not raw:
+        device_type = 'unknown'
+    elif BOT_PATTERN.search(raw):
+        device_type = 'bot'
+    elif TABLET_PATTERN.search(raw) or ('Android' in raw and 'Mobile' not in raw):
+        device_type = 'tablet'
+    elif MOBILE_PATTERN.search(raw):
+        device_type = 'mobile'
+    else:
+        device_type = 'desktop'
+
+    return {
+        'browser': browser,
+        'browser_version': browser_version[:50],
+        'os': os_name,
+        'os_version': os_version[:50],
+        'device_type': device_type,
+    }
@@ -0,0 +1,39 @@
+# admin_panel/exports.py
+# Platform-wide reports for the Dovepeak team
+from django.db.models import Count, Q
+
+from accounts.models import VendorProfile
+from core.exports import CSVExport, register_export
+
+
+@register_export
+class VendorReportExport(CSVExport):
+    """
+    Every vendor with performance metrics, KYC status and token balances
+    """
+    name = 'vendors'
+    header = [
+        'vendor_id', 'shop_name', 'business_name', 'username', 'email', 'phone',
+        'shop_category', 'kyc_status', 'documents_approved', 'documents_pending',
+        'token_balance', 'tokens_purchased', 'tokens_used', 'last_token_purchase',
+        'total_sales', 'total_orders', 'average_rating', 'response_rate',
+        'is_featured', 'is_premium', 'joined_platform_date',
+    ]
+
+    def get_queryset(self):
+        return VendorProfile.objects.select_related('user').annotate(
+            documents_approved=Count('user__verification_docs', filter=Q(user__verification_docs__is_approved=True)),
+            documents_pending=Count('user__verification_docs', filter=Q(user__verification_docs__is_approved=False)),
+        )
+
+    def row(self, vendor):
+        user = vendor.user
+        return [
+            vendor.pk, vendor.shop_name, vendor.business_name, user.username, user.email,
+            vendor.business_phone, vendor.shop_category, user.verification_status,
+            vendor.documents_approved, vendor.documents_pending,
+            vendor.token_balance, vendor.total_tokens_purchased, vendor.total_tokens_used,
+            vendor.last_token_purchase.isoformat() if vendor.last_token_purchase else '',
+            vendor.total_sales, vendor.total_orders, vendor.average_rating, vendor.response_rate,
+            vendor.is_featured, vendor.is_premium, vendor.joined_platform_date.isoformat(),
+        ]
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'admin_panel'
+
+urlpatterns = [
+    path('exports/vendors/', views.export_vendors, name='export_vendors'),
+]
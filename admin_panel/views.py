@@ -1,3 +1,17 @@
-from django.shortcuts import render
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.views.decorators.http import require_http_methods
 
-# Create your views here.
+from core.exports import export_response, queue_export
+from .exports import VendorReportExport
+
+
+@staff_member_required
+@require_http_methods(['GET', 'POST'])
+def export_vendors(request):
+    """Stream the vendor report on GET; a (CSRF-protected) POST queues it as a background job"""
+    export = VendorReportExport()
+    if request.method == 'POST':
+        job = queue_export(export, request.user)
+        return JsonResponse({'job_id': job.pk, 'status': job.status}, status=202)
+    return export_response(request, export)
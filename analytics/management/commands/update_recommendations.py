@@ -0,0 +1,30 @@
+#analytics/management/commands/update_recommendations.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from analytics.models import CoVisitationSnapshot
+from analytics.recommendations import BATCH_SIZE, TOP_K, update_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Fold new product views and shop visits into the co-visitation matrix and refresh neighbor lists'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--top-k', type=int, default=TOP_K)
+        parser.add_argument('--rebuild', action='store_true', help='Discard the snapshot and rebuild from all activity')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            CoVisitationSnapshot.objects.filter(name='default').delete()
+
+        start = time.perf_counter()
+        processed = update_recommendations(batch_size=options['batch_size'], top_k=options['top_k'])
+        elapsed = time.perf_counter() - start
+
+        snapshot = CoVisitationSnapshot.objects.get(name='default')
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {processed} activities in {elapsed:.2f}s; "
+            f"{len(snapshot.item_keys)} items, watermark at activity {snapshot.last_activity_id}"
+        ))
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoVisitationSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(default='default', max_length=50, unique=True)),
+                ('matrix', models.BinaryField(blank=True, help_text='scipy.sparse CSR matrix in .npz format')),
+                ('item_keys', models.JSONField(blank=True, default=list, help_text='Matrix index -> "type:id" key')),
+                ('open_sessions', models.JSONField(blank=True, default=dict, help_text='Sessions still open at the watermark, keyed by user id')),
+                ('last_activity_id', models.BigIntegerField(default=0)),
+                ('activities_processed', models.PositiveBigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'analytics_covisitation_snapshot',
+            },
+        ),
+        migrations.CreateModel(
+            name='ItemNeighbors',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_type', models.CharField(choices=[('product', 'Product'), ('vendor', 'Vendor')], max_length=10)),
+                ('item_id', models.PositiveBigIntegerField()),
+                ('neighbors', models.JSONField(default=list, help_text='[[item_id, score], ...] best first')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'analytics_item_neighbors',
+                'unique_together': {('item_type', 'item_id')},
+            },
+        ),
+    ]
@@ -1,3 +1,51 @@
+#analytics/models.py
 from django.db import models
 
-# Create your models here.
+
+class CoVisitationSnapshot(models.Model):
+    """
+    Sparse item-item co-visitation matrix persisted between incremental runs
+    """
+    name = models.CharField(max_length=50, unique=True, default='default')
+    matrix = models.BinaryField(blank=True, help_text='scipy.sparse CSR matrix in .npz format')
+    item_keys = models.JSONField(default=list, blank=True, help_text='Matrix index -> "type:id" key')
+    open_sessions = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text='Sessions still open at the watermark, keyed by user id'
+    )
+
+    # Watermark
+    last_activity_id = models.BigIntegerField(default=0)
+    activities_processed = models.PositiveBigIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'analytics_covisitation_snapshot'
+
+    def __str__(self):
+        return f"{self.name} ({len(self.item_keys)} items, up to activity {self.last_activity_id})"
+
+
+class ItemNeighbors(models.Model):
+    """
+    Precomputed "customers also viewed" neighbors for a product or vendor
+    """
+    ITEM_TYPE_CHOICES = [
+        ('product', 'Product'),
+        ('vendor', 'Vendor'),
+    ]
+
+    item_type = models.CharField(max_length=10, choices=ITEM_TYPE_CHOICES)
+    item_id = models.PositiveBigIntegerField()
+    neighbors = models.JSONField(default=list, help_text='[[item_id, score], ...] best first')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'analytics_item_neighbors'
+        unique_together = ['item_type', 'item_id']
+
+    def __str__(self):
+        return f"{self.item_type}:{self.item_id} ({len(self.neighbors)} neighbors)"
@@ -0,0 +1,234 @@
+#analytics/recommendations.py
+# Incremental item-item co-visitation recommendations built from UserActivity
+import io
+from datetime import timedelta
+from itertools import takewhile
+
+import numpy as np
+from scipy import sparse
+
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from accounts.models import UserActivity
+from .models import CoVisitationSnapshot, ItemNeighbors
+
+
+# activity_type -> (item_type, metadata key holding the item id)
+ITEM_SOURCES = {
+    'product_view': ('product', 'product_id'),
+    'shop_visit': ('vendor', 'vendor_id'),
+}
+
+SESSION_GAP = timedelta(minutes=30)
+MAX_SESSION_ITEMS = 50
+TOP_K = 20
+BATCH_SIZE = 5000
+# Rows younger than this are left for the next run: an open transaction may
+# still commit a lower id, which a watermark already past it would skip
+WATERMARK_LAG = timedelta(seconds=30)
+
+
+class CoVisitationMatrix:
+    """
+    Symmetric sparse matrix of how many sessions viewed both items.
+    The diagonal holds how many sessions viewed each item at all.
+    """
+
+    def __init__(self, matrix=None, item_keys=None):
+        self.item_keys = list(item_keys or [])
+        self.index = {key: i for i, key in enumerate(self.item_keys)}
+        size = len(self.item_keys)
+        self.matrix = matrix if matrix is not None else sparse.csr_matrix((size, size), dtype=np.int32)
+        self._rows = []
+        self._cols = []
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        matrix = None
+        if snapshot.matrix:
+            matrix = sparse.load_npz(io.BytesIO(bytes(snapshot.matrix))).tocsr()
+        return cls(matrix, snapshot.item_keys)
+
+    def dump(self):
+        buffer = io.BytesIO()
+        sparse.save_npz(buffer, self.matrix, compressed=True)
+        return buffer.getvalue()
+
+    def index_for(self, key):
+        i = self.index.get(key)
+        if i is None:
+            i = self.index[key] = len(self.item_keys)
+            self.item_keys.append(key)
+        return i
+
+    def add_visit(self, item, session_items):
+        """Count item as newly seen in a session that already saw session_items"""
+        self._rows.append(item)
+        self._cols.append(item)
+        for other in session_items:
+            self._rows.extend((item, other))
+            self._cols.extend((other, item))
+
+    def apply(self):
+        """
+        Fold pending increments into the matrix and return the indexes whose
+        neighbor lists changed: the items visited, plus every item co-visited
+        with one whose view count changed, since cosine scores divide by the
+        neighbor's diagonal too.
+        """
+        size = len(self.item_keys)
+        if self.matrix.shape[0] < size:
+            self.matrix.resize((size, size))
+        if not self._rows:
+            return set()
+        rows = np.asarray(self._rows, dtype=np.int64)
+        cols = np.asarray(self._cols, dtype=np.int64)
+        delta = sparse.coo_matrix((np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=(size, size))
+        self.matrix = (self.matrix + delta.tocsr()).tocsr()
+        self._rows, self._cols = [], []
+
+        affected = set(np.unique(rows).tolist())
+        recounted = np.unique(rows[rows == cols])
+        affected.update(np.unique(self.matrix[recounted].indices).tolist())
+        return affected
+
+    def top_k(self, items, k=TOP_K):
+        """
+        Yield (item_key, [[neighbor_id, score], ...]) for each index in items.
+        Scores are cosine-normalised co-visits; neighbors share the item's type.
+        """
+        matrix = self.matrix
+        diagonal = matrix.diagonal().astype(np.float64)
+        types = np.array([key.split(':', 1)[0] for key in self.item_keys])
+        ids = [int(key.split(':', 1)[1]) for key in self.item_keys]
+
+        for i in items:
+            start, end = matrix.indptr[i], matrix.indptr[i + 1]
+            cols = matrix.indices[start:end]
+            counts = matrix.data[start:end].astype(np.float64)
+            keep = (cols != i) & (types[cols] == types[i]) & (counts > 0)
+            cols, counts = cols[keep], counts[keep]
+            if len(cols) == 0:
+                yield self.item_keys[i], []
+                continue
+
+            scores = counts / np.sqrt(diagonal[i] * diagonal[cols])
+            if len(cols) > k:
+                best = np.argpartition(-scores, k - 1)[:k]
+                cols, scores = cols[best], scores[best]
+            order = np.argsort(-scores, kind='stable')
+            yield self.item_keys[i], [[ids[c], round(float(s), 4)] for c, s in zip(cols[order], scores[order])]
+
+
+def _item_key(activity_type, metadata):
+    item_type, field = ITEM_SOURCES[activity_type]
+    item_id = (metadata or {}).get(field)
+    try:
+        return f"{item_type}:{int(item_id)}"
+    except (TypeError, ValueError):
+        return None
+
+
+def _fold_page(matrix, sessions, rows):
+    """Count one page of activity rows into matrix, updating the open sessions in place"""
+    gap = SESSION_GAP.total_seconds()
+    newest = None
+    for pk, user_id, activity_type, metadata, timestamp in rows:
+        key = _item_key(activity_type, metadata)
+        if key is None:
+            continue
+        ts = timestamp.timestamp()
+        newest = ts if newest is None else max(newest, ts)
+
+        session = sessions.get(str(user_id))
+        if session is None or ts - session['last'] > gap:
+            session = sessions[str(user_id)] = {'last': ts, 'items': []}
+        session['last'] = max(session['last'], ts)
+
+        item = matrix.index_for(key)
+        if item not in session['items'] and len(session['items']) < MAX_SESSION_ITEMS:
+            matrix.add_visit(item, session['items'])
+            session['items'].append(item)
+
+    if newest is None:
+        return sessions
+    return {user: s for user, s in sessions.items() if newest - s['last'] <= gap}
+
+
+def _save_neighbors(matrix, items, top_k):
+    neighbors = []
+    for key, ranked in matrix.top_k(sorted(items), k=top_k):
+        item_type, item_id = key.split(':', 1)
+        neighbors.append(ItemNeighbors(item_type=item_type, item_id=int(item_id), neighbors=ranked))
+
+    # MySQL's ON DUPLICATE KEY UPDATE takes no conflict target; the
+    # (item_type, item_id) unique key is the only one that can fire there
+    using = router.db_for_write(ItemNeighbors)
+    unique_fields = None
+    if connections[using].features.supports_update_conflicts_with_target:
+        unique_fields = ['item_type', 'item_id']
+    ItemNeighbors.objects.using(using).bulk_create(
+        neighbors,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=['neighbors', 'updated_at'],
+    )
+
+
+def update_recommendations(batch_size=BATCH_SIZE, top_k=TOP_K, name='default', lag=WATERMARK_LAG):
+    """
+    Fold activity recorded after the snapshot watermark into the co-visitation
+    matrix and refresh the neighbor table for every item whose scores changed.
+
+    Each page of batch_size rows is one transaction holding the snapshot row
+    lock: the matrix, open sessions, neighbor lists and watermark commit
+    together, so concurrent runs never count a row twice and an interrupted
+    run resumes from its last committed page. Rows newer than lag are left
+    for the next run, so rows committed out of id order aren't skipped.
+    Returns the number of activity rows processed.
+    """
+    CoVisitationSnapshot.objects.get_or_create(name=name)
+    cutoff = timezone.now() - lag
+    matrix = None
+    committed_id = None
+    processed = 0
+    while True:
+        with transaction.atomic():
+            snapshot = CoVisitationSnapshot.objects.select_for_update().get(name=name)
+            if matrix is None or snapshot.last_activity_id != committed_id:
+                # First page, or another run moved the snapshot on since our last page
+                matrix = CoVisitationMatrix.from_snapshot(snapshot)
+
+            rows = list(
+                UserActivity.objects.filter(pk__gt=snapshot.last_activity_id, activity_type__in=ITEM_SOURCES)
+                .order_by('pk')
+                .values_list('pk', 'user_id', 'activity_type', 'metadata', 'timestamp')[:batch_size]
+            )
+            settled = list(takewhile(lambda row: row[4] < cutoff, rows))
+            if not settled:
+                return processed
+
+            snapshot.open_sessions = _fold_page(matrix, snapshot.open_sessions, settled)
+            _save_neighbors(matrix, matrix.apply(), top_k)
+
+            snapshot.matrix = matrix.dump()
+            snapshot.item_keys = matrix.item_keys
+            snapshot.last_activity_id = committed_id = settled[-1][0]
+            snapshot.activities_processed += len(settled)
+            snapshot.save()
+            processed += len(settled)
+
+        if len(settled) < batch_size:
+            return processed
+
+
+def also_viewed(item_type, item_id, limit=10):
+    """Return up to limit neighbor ids for an item; a single indexed key lookup"""
+    neighbors = (
+        ItemNeighbors.objects.filter(item_type=item_type, item_id=item_id)
+        .values_list('neighbors', flat=True)
+        .first()
+    )
+    return [neighbor_id for neighbor_id, _ in (neighbors or [])[:limit]]
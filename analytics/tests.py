@@ -1,3 +1,131 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User, UserActivity
+from .models import CoVisitationSnapshot, ItemNeighbors
+from .recommendations import SESSION_GAP, CoVisitationMatrix, update_recommendations
+
+
+class CoVisitationMatrixTests(SimpleTestCase):
+    def build(self, sessions):
+        matrix = CoVisitationMatrix()
+        for keys in sessions:
+            seen = []
+            for key in keys:
+                item = matrix.index_for(key)
+                matrix.add_visit(item, seen)
+                seen.append(item)
+        return matrix
+
+    def neighbors(self, matrix, key):
+        return dict(matrix.top_k([matrix.index[key]]))[key]
+
+    def test_cosine_scores_best_first(self):
+        matrix = self.build([
+            ['product:1', 'product:2', 'product:3'],
+            ['product:1', 'product:2'],
+            ['product:3'],
+        ])
+        matrix.apply()
+        # 1 and 2: 2 shared sessions / sqrt(2 * 2); 1 and 3: 1 / sqrt(2 * 2)
+        self.assertEqual(self.neighbors(matrix, 'product:1'), [[2, 1.0], [3, 0.5]])
+
+    def test_neighbors_share_the_item_type(self):
+        matrix = self.build([['product:1', 'vendor:1', 'product:2']])
+        matrix.apply()
+        self.assertEqual(self.neighbors(matrix, 'product:1'), [[2, 1.0]])
+        self.assertEqual(self.neighbors(matrix, 'vendor:1'), [])
+
+    def test_apply_reports_neighbors_of_recounted_items(self):
+        matrix = self.build([['product:1', 'product:3'], ['product:5']])
+        matrix.apply()
+
+        # A new session viewing only 3 changes the score 1 has for it
+        matrix.add_visit(matrix.index_for('product:3'), [])
+        affected = matrix.apply()
+        self.assertEqual(affected, {matrix.index['product:3'], matrix.index['product:1']})
+        self.assertEqual(self.neighbors(matrix, 'product:1'), [[3, 0.7071]])
+
+    def test_top_k_limits_neighbors(self):
+        matrix = self.build([['product:1'] + [f'product:{i}' for i in range(2, 12)]])
+        matrix.apply()
+        self.assertEqual(len(dict(matrix.top_k([0], k=3))['product:1']), 3)
+
+
+class UpdateRecommendationsTests(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create(username=f'buyer{i}', email=f'buyer{i}@example.com', phone_number=f'+25470000000{i}')
+            for i in range(3)
+        ]
+        self.start = timezone.now() - timedelta(days=1)
+
+    def view(self, user, product_id, minutes):
+        activity = UserActivity.objects.record(
+            user, 'product_view', '10.0.0.1', metadata={'product_id': product_id}
+        )
+        UserActivity.objects.filter(pk=activity.pk).update(timestamp=self.start + timedelta(minutes=minutes))
+
+    def neighbors(self, product_id):
+        return ItemNeighbors.objects.get(item_type='product', item_id=product_id).neighbors
+
+    def test_sessions_split_at_the_gap(self):
+        gap = SESSION_GAP.total_seconds() / 60
+        self.view(self.users[0], 1, 0)
+        self.view(self.users[0], 2, gap)
+        self.view(self.users[0], 3, 2 * gap + 1)
+        update_recommendations()
+
+        self.assertEqual(self.neighbors(1), [[2, 1.0]])
+        self.assertEqual(self.neighbors(3), [])
+
+    def test_paged_incremental_runs_match_a_rebuild(self):
+        views = [(0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 3), (2, 4), (0, 4), (1, 1)]
+        for minute, (user, product) in enumerate(views[:5]):
+            self.view(self.users[user], product, minute)
+        update_recommendations(batch_size=2)
+        for minute, (user, product) in enumerate(views[5:], start=5):
+            self.view(self.users[user], product, minute)
+        self.assertEqual(update_recommendations(batch_size=2), 4)
+        incremental = dict(ItemNeighbors.objects.values_list('item_id', 'neighbors'))
+
+        CoVisitationSnapshot.objects.all().delete()
+        ItemNeighbors.objects.all().delete()
+        update_recommendations()
+        self.assertEqual(dict(ItemNeighbors.objects.values_list('item_id', 'neighbors')), incremental)
+
+        snapshot = CoVisitationSnapshot.objects.get()
+        self.assertEqual(snapshot.last_activity_id, UserActivity.objects.latest('pk').pk)
+
+    def test_recent_rows_wait_behind_the_lag(self):
+        self.view(self.users[0], 1, 0)
+        recent = UserActivity.objects.record(self.users[0], 'product_view', '10.0.0.1', metadata={'product_id': 2})
+        self.view(self.users[0], 3, 1)
+
+        self.assertEqual(update_recommendations(), 1)
+        self.assertEqual(CoVisitationSnapshot.objects.get().last_activity_id, recent.pk - 1)
+        self.assertEqual(update_recommendations(lag=timedelta(0)), 2)
+
+
+class AlsoViewedViewTests(TestCase):
+    def setUp(self):
+        ItemNeighbors.objects.create(
+            item_type='product', item_id=1, neighbors=[[i, 1 - i / 100] for i in range(2, 80)]
+        )
+
+    def get(self, item_type='product', item_id=1, **params):
+        url = reverse('analytics:customers_also_viewed', kwargs={'item_type': item_type, 'item_id': item_id})
+        return self.client.get(url, params)
+
+    def test_limit_is_clamped(self):
+        self.assertEqual(self.get(limit=3).json()['also_viewed'], [2, 3, 4])
+        self.assertEqual(len(self.get(limit=500).json()['also_viewed']), 50)
+        self.assertEqual(self.get(limit=-3).json()['also_viewed'], [2])
+        self.assertEqual(len(self.get(limit='x').json()['also_viewed']), 10)
+
+    def test_unknown_item(self):
+        self.assertEqual(self.get(item_id=99).json()['also_viewed'], [])
+        self.assertEqual(self.get(item_type='order').status_code, 404)
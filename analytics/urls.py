@@ -0,0 +1,13 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'analytics'
+
+urlpatterns = [
+    path(
+        'also-viewed/<str:item_type>/<int:item_id>/',
+        views.customers_also_viewed,
+        name='customers_also_viewed'
+    ),
+]
@@ -1,3 +1,21 @@
-from django.shortcuts import render
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_GET
 
-# Create your views here.
+from .models import ItemNeighbors
+from .recommendations import also_viewed
+
+
+@require_GET
+def customers_also_viewed(request, item_type, item_id):
+    """Precomputed "customers also viewed" ids for a product or vendor"""
+    if item_type not in dict(ItemNeighbors.ITEM_TYPE_CHOICES):
+        raise Http404
+    try:
+        limit = max(1, min(int(request.GET.get('limit', 10)), 50))
+    except ValueError:
+        limit = 10
+    return JsonResponse({
+        'item_type': item_type,
+        'item_id': item_id,
+        'also_viewed': also_viewed(item_type, item_id, limit=limit),
+    })
@@ -56,6 +56,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.StaticFilesMiddleware',
+    'core.middleware.QuerySampleMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -108,6 +110,29 @@ else:
         }
     }
 
+# Query sampling for manage.py index_advisor (0 disables it)
+INDEX_ADVISOR_SAMPLE_RATE = env.float('INDEX_ADVISOR_SAMPLE_RATE', default=0.0)
+INDEX_ADVISOR_LOG = env('INDEX_ADVISOR_LOG', default=str(BASE_DIR / 'query_samples.jsonl'))
+
+# Sessions (core.session_backend)
+SESSION_ENGINE = 'core.session_backend'
+SESSION_LOCAL_CACHE_SIZE = env.int('SESSION_LOCAL_CACHE_SIZE', default=10000)
+# Seconds a process may serve a session from its own memory before re-reading the
+# database; also how long a logout elsewhere can take to reach this process
+SESSION_LOCAL_CACHE_TTL = env.float('SESSION_LOCAL_CACHE_TTL', default=2.0)
+# Keys whose changes alone are kept in memory and persisted by a later save, once this
+# many seconds have passed; pending values are lost on eviction or process exit
+SESSION_WRITE_BEHIND_KEYS = ['last_active']
+SESSION_WRITE_BEHIND_INTERVAL = env.int('SESSION_WRITE_BEHIND_INTERVAL', default=60)
+
+# M-Pesa STK callbacks (payments)
+# Secret path segment of the callback URL registered with Daraja
+MPESA_CALLBACK_TOKEN = env('MPESA_CALLBACK_TOKEN', default='')
+MPESA_CALLBACK_ALLOWED_IPS = env.list('MPESA_CALLBACK_ALLOWED_IPS', default=[])
+# Reverse proxies in front of the app (1 on Render). The allowlist is checked against
+# the X-Forwarded-For entry that many hops from the right; 0 uses REMOTE_ADDR
+MPESA_CALLBACK_PROXY_COUNT = env.int('MPESA_CALLBACK_PROXY_COUNT', default=0)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -138,11 +163,34 @@ USE_I18N = True
 
 USE_TZ = True
 
+# Currency conversion (core.currency)
+# Rates come from CURRENCY_RATES_FILE (JSON) and the admin-managed
+# ExchangeRate model, which takes precedence
+CURRENCY_BASE = 'KES'
+CURRENCY_RATES_FILE = env('CURRENCY_RATES_FILE', default=None)
+
 
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# collectstatic writes content-hashed names plus .gz variants, which
+# core.middleware.StaticFilesMiddleware serves with immutable caching.
+# Run `python manage.py collectstatic --noinput` as a build step on every deploy;
+# without it pages fall back to unhashed, short-cached names.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'core.staticfiles.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# Background CSV exports (core.exports)
+EXPORT_ROOT = env('EXPORT_ROOT', default=str(BASE_DIR / 'exports'))
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -1,3 +1,11 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import ExchangeRate
+
+
+@admin.register(ExchangeRate)
+class ExchangeRateAdmin(admin.ModelAdmin):
+    list_display = ['currency', 'rate', 'source', 'is_active', 'updated_at']
+    list_filter = ['is_active']
+    list_editable = ['rate', 'is_active']
+    search_fields = ['currency']
@@ -1,8 +1,15 @@
 #core/apps.py
 # Shared utilities, constants, and common functionality
 from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Register CSV reports defined in each app's exports.py
+        autodiscover_modules('exports')
+        # Connect the ExchangeRate signal handlers that invalidate the rate table
+        from . import currency  # noqa: F401
@@ -0,0 +1,165 @@
+#core/currency.py
+# Versioned in-memory exchange rate table and batch price conversion
+import json
+import os
+import threading
+import time
+from decimal import ROUND_HALF_UP, Decimal, localcontext
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import ExchangeRate
+
+
+# How often a process checks the database and rates file for changes
+CHECK_INTERVAL = 5
+
+# ISO 4217 minor units; anything not listed uses 2 decimal places
+MINOR_UNITS = {
+    'BIF': 0, 'CLP': 0, 'JPY': 0, 'KRW': 0, 'RWF': 0, 'UGX': 0, 'XAF': 0, 'XOF': 0,
+    'BHD': 3, 'KWD': 3, 'OMR': 3, 'TND': 3,
+}
+
+
+class UnknownCurrency(ValueError):
+    pass
+
+
+class RateTable:
+    """
+    Immutable snapshot of rates (units of currency per one base unit).
+    Replaced as a whole when the version changes, so readers never see
+    a half-loaded table.
+    """
+
+    def __init__(self, version, rates, base=None):
+        self.version = version
+        self.base = base or settings.CURRENCY_BASE
+        self.rates = {self.base: Decimal(1), **rates}
+
+    def rate(self, currency):
+        try:
+            return self.rates[currency.upper()]
+        except KeyError:
+            raise UnknownCurrency(f"No exchange rate for {currency}")
+
+    def factor(self, from_currency, to_currency):
+        """Multiplier converting amounts in from_currency to to_currency"""
+        with localcontext() as context:
+            context.prec = 28
+            return self.rate(to_currency) / self.rate(from_currency)
+
+
+def _file_rates(path):
+    with open(path) as handle:
+        data = json.load(handle)
+    return {code.upper(): Decimal(str(rate)) for code, rate in data.get('rates', data).items()}
+
+
+def _file_version(path):
+    return f"{os.path.getmtime(path):.6f}" if path and os.path.exists(path) else ''
+
+
+def load_rate_table(version=None):
+    """Build a fresh RateTable from the rates file, overridden by active ExchangeRate rows"""
+    path = settings.CURRENCY_RATES_FILE
+    rates = _file_rates(path) if path and os.path.exists(path) else {}
+    rates.update(ExchangeRate.objects.filter(is_active=True).values_list('currency', 'rate'))
+    # A zero or negative rate (bad file entry, row saved around validation)
+    # would break every conversion from that currency; treat it as missing
+    rates = {currency: rate for currency, rate in rates.items() if rate > 0}
+    return RateTable(version if version is not None else current_version(), rates)
+
+
+def current_version():
+    """
+    Version key for the rates, derived from sources every process shares:
+    the newest ExchangeRate.updated_at and the row count (which catches
+    deletes), plus the rates file mtime. Writes through queryset.update()
+    skip auto_now and must set updated_at themselves.
+    """
+    stats = ExchangeRate.objects.aggregate(latest=Max('updated_at'), count=Count('id'))
+    latest = stats['latest'].isoformat() if stats['latest'] else ''
+    return f"{latest}:{stats['count']}:{_file_version(settings.CURRENCY_RATES_FILE)}"
+
+
+def invalidate_rates():
+    """Make this process re-check the version on its next lookup; others do within CHECK_INTERVAL"""
+    _state['checked_at'] = float('-inf')
+
+
+_lock = threading.Lock()
+_state = {'table': None, 'checked_at': float('-inf')}
+
+
+def get_rate_table():
+    """
+    Return the process-wide RateTable, reloading it when the version key
+    changed. The version is checked at most every CHECK_INTERVAL seconds.
+    """
+    table = _state['table']
+    now = time.monotonic()
+    if table is not None and now - _state['checked_at'] < CHECK_INTERVAL:
+        return table
+
+    with _lock:
+        version = current_version()
+        if _state['table'] is None or _state['table'].version != version:
+            _state['table'] = load_rate_table(version)
+        _state['checked_at'] = now
+        return _state['table']
+
+
+def _to_decimal(amount):
+    if isinstance(amount, Decimal):
+        return amount
+    # str() first so floats don't carry binary noise into the result
+    return Decimal(str(amount))
+
+
+def convert_prices(amounts, to_currency, from_currency=None):
+    """
+    Convert a whole page of prices at once. The rate is looked up and the
+    factor computed once; each amount is multiplied and rounded a single
+    time (half up) to the target currency's minor unit.
+    """
+    from_currency = from_currency or settings.CURRENCY_BASE
+    to_currency = to_currency.upper()
+    table = get_rate_table()
+    factor = table.factor(from_currency, to_currency)
+    quantum = Decimal(1).scaleb(-MINOR_UNITS.get(to_currency, 2))
+
+    with localcontext() as context:
+        context.prec = 28
+        context.rounding = ROUND_HALF_UP
+        return [
+            None if amount is None else (_to_decimal(amount) * factor).quantize(quantum)
+            for amount in amounts
+        ]
+
+
+def convert_price(amount, to_currency, from_currency=None):
+    return convert_prices([amount], to_currency, from_currency)[0]
+
+
+def convert_for_user(user, amounts, from_currency=None):
+    """Convert amounts into the user's preferred_currency, falling back to the base currency"""
+    currency = settings.CURRENCY_BASE
+    profile = getattr(user, 'profile', None) if getattr(user, 'is_authenticated', False) else None
+    if profile is not None and profile.preferred_currency:
+        currency = profile.preferred_currency
+    try:
+        return currency.upper(), convert_prices(amounts, currency, from_currency)
+    except UnknownCurrency:
+        return settings.CURRENCY_BASE, convert_prices(amounts, settings.CURRENCY_BASE, from_currency)
+
+
+@receiver(post_save, sender=ExchangeRate)
+@receiver(post_delete, sender=ExchangeRate)
+def exchange_rate_changed(sender, **kwargs):
+    # After commit, so the re-check sees the new rows
+    transaction.on_commit(invalidate_rates)
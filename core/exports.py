@@ -0,0 +1,207 @@
+#core/exports.py
+# Streaming CSV export framework shared by the admin and vendor reports
+import csv
+import gzip
+import io
+import os
+import uuid
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
+
+from . import jobs
+from .middleware import accepts_gzip
+from .models import ExportJob
+
+
+EXPORTS = {}
+CHUNK_SIZE = 2000
+
+# Leading characters that make spreadsheets evaluate a cell as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def escape_formula(value):
+    """Quote text cells a spreadsheet would run as a formula (CSV injection)"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def register_export(cls):
+    """Class decorator making an export available to background ExportJobs by name"""
+    EXPORTS[cls.name] = cls
+    return cls
+
+
+def get_export(name, **params):
+    return EXPORTS[name](**params)
+
+
+def keyset_iterator(queryset, chunk_size=CHUNK_SIZE, start_after=None):
+    """
+    Yield pages of objects ordered by primary key. Each page is a
+    WHERE pk > last query read through iterator(), so the cost of a page
+    never depends on how deep into the table the export is.
+    """
+    last_pk = start_after
+    while True:
+        page = queryset.order_by('pk')
+        if last_pk is not None:
+            page = page.filter(pk__gt=last_pk)
+        objects = list(page[:chunk_size].iterator(chunk_size=chunk_size))
+        if not objects:
+            return
+        yield objects
+        last_pk = objects[-1].pk
+
+
+class CSVExport:
+    """
+    Base class for CSV reports. Subclasses set name and header and
+    implement get_queryset() and row().
+    """
+    name = None
+    header = []
+    chunk_size = CHUNK_SIZE
+
+    def __init__(self, **params):
+        self.params = params
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def row(self, obj):
+        raise NotImplementedError
+
+    def get_filename(self):
+        return f"{self.name}-{timezone.now():%Y%m%d-%H%M}.csv"
+
+    def _encode(self, rows):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows([escape_formula(value) for value in row] for row in rows)
+        return buffer.getvalue().encode('utf-8')
+
+    def header_bytes(self):
+        return self._encode([self.header])
+
+    def pages(self, start_after=None):
+        """Yield (last_pk, row_count, csv_bytes) for each page after start_after"""
+        for objects in keyset_iterator(self.get_queryset(), self.chunk_size, start_after):
+            yield objects[-1].pk, len(objects), self._encode(self.row(obj) for obj in objects)
+
+    def stream(self):
+        yield self.header_bytes()
+        for _, _, data in self.pages():
+            yield data
+
+
+def export_response(request, export, compress=None):
+    """
+    Stream an export as CSV. Memory stays flat: one page of rows is held
+    at a time. The body is gzip encoded when the client accepts it, unless
+    compress is passed explicitly.
+    """
+    if compress is None:
+        compress = bool(accepts_gzip.search(request.headers.get('Accept-Encoding', '')))
+
+    content = export.stream()
+    response = StreamingHttpResponse(
+        compress_sequence(content) if compress else content,
+        content_type='text/csv; charset=utf-8',
+    )
+    response['Content-Disposition'] = f'attachment; filename="{export.get_filename()}"'
+    if compress:
+        response['Content-Encoding'] = 'gzip'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def queue_export(export, user, compress=True):
+    """Create a background ExportJob for export on behalf of user"""
+    file_name = f"{export.name}/{uuid.uuid4().hex}-{export.get_filename()}"
+    if compress:
+        file_name += '.gz'
+    return ExportJob.objects.create(
+        export_name=export.name,
+        params=export.params,
+        compress=compress,
+        file_name=file_name,
+        created_by=user,
+    )
+
+
+def claim_next_job():
+    """Claim a pending or abandoned ExportJob for this worker, or return None"""
+    return jobs.claim_next_job(ExportJob, 'created_at')
+
+
+def export_path(job):
+    return os.path.join(settings.EXPORT_ROOT, job.file_name)
+
+
+def delete_export_files(pks):
+    """Remove the files written for the given ExportJobs; returns how many existed"""
+    deleted = 0
+    for job in ExportJob.objects.filter(pk__in=pks).only('file_name'):
+        try:
+            os.remove(export_path(job))
+        except FileNotFoundError:
+            continue
+        deleted += 1
+    return deleted
+
+
+def run_export_job(job, on_page=None):
+    """
+    Write a background export to disk, resuming after the last committed page.
+    The file is truncated back to the recorded size before resuming, so a page
+    written but not recorded by a crashed run is never duplicated. Compressed
+    files get one gzip member per page, which standard gzip readers concatenate.
+    """
+    export = get_export(job.export_name, **job.params)
+    path = export_path(job)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def encode(data):
+        return gzip.compress(data) if job.compress else data
+
+    mode = 'r+b' if job.bytes_written and os.path.exists(path) else 'wb'
+    try:
+        with open(path, mode) as handle:
+            if mode == 'wb':
+                job.bytes_written = 0
+                job.rows_written = 0
+                job.last_key = None
+            handle.truncate(job.bytes_written)
+            handle.seek(job.bytes_written)
+
+            if job.bytes_written == 0:
+                handle.write(encode(export.header_bytes()))
+
+            for last_key, count, data in export.pages(start_after=job.last_key):
+                handle.write(encode(data))
+                handle.flush()
+                os.fsync(handle.fileno())
+                job.last_key = last_key
+                job.rows_written += count
+                job.bytes_written = handle.tell()
+                job.heartbeat_at = timezone.now()
+                job.save(update_fields=['last_key', 'rows_written', 'bytes_written', 'heartbeat_at'])
+                if on_page:
+                    on_page(job)
+
+            job.bytes_written = handle.tell()
+    except Exception as exc:
+        job.status = 'failed'
+        job.last_error = repr(exc)
+        job.save(update_fields=['status', 'last_error'])
+        raise
+
+    job.status = 'completed'
+    job.completed_at = timezone.now()
+    job.save(update_fields=['status', 'bytes_written', 'completed_at'])
+    return job
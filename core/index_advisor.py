@@ -0,0 +1,282 @@
+#core/index_advisor.py
+# Query sampling and EXPLAIN-based index analysis behind manage.py index_advisor
+import json
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection as default_connection
+
+
+SAMPLED_STATEMENTS = ('SELECT', 'UPDATE', 'DELETE')
+# Stored in place of text parameters, which can hold emails, phone numbers
+# or session keys. Plans depend on the SQL shape, not on the literal.
+REDACTED = 'redacted'
+# Backends receive dates, datetimes and times already formatted as strings;
+# they are kept so time-range predicates still EXPLAIN against a valid literal
+TEMPORAL_PARAM = re.compile(
+    r'^(?:\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}(?::\d{2}(?:\.\d{1,6})?)?)?'
+    r'|\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?)(?:Z|[+-]\d{2}:?\d{2})?$'
+)
+
+_write_lock = threading.Lock()
+
+
+def _redact(value):
+    if isinstance(value, str):
+        return value if TEMPORAL_PARAM.match(value) else REDACTED
+    if isinstance(value, (bytes, memoryview)):
+        return REDACTED
+    return value
+
+
+def redact_params(params):
+    """Keep numbers, booleans, NULLs and date/time strings; replace other text and binary values"""
+    return [_redact(value) for value in params or ()]
+
+
+class QueryRecorder:
+    """
+    connection.execute_wrapper that appends SELECT/UPDATE/DELETE statements,
+    with redacted parameters and their duration, to a JSON-lines file
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if not many and sql.lstrip()[:6].upper() in SAMPLED_STATEMENTS:
+                record = {
+                    'sql': sql,
+                    'params': redact_params(params),
+                    'duration': round(time.perf_counter() - start, 6),
+                    'alias': context['connection'].alias,
+                }
+                with _write_lock, open(self.path, 'a') as handle:
+                    handle.write(json.dumps(record, default=str) + '\n')
+
+
+@contextmanager
+def record_queries(path=None, connection=default_connection):
+    """Record every query run inside the block, e.g. around a worker batch"""
+    with connection.execute_wrapper(QueryRecorder(path or settings.INDEX_ADVISOR_LOG)):
+        yield
+
+
+def should_sample():
+    rate = settings.INDEX_ADVISOR_SAMPLE_RATE
+    return rate > 0 and random.random() < rate
+
+
+class QueryGroup:
+    """All samples sharing the same parameterised SQL text"""
+
+    def __init__(self, sql, params):
+        self.sql = sql
+        self.params = params
+        self.count = 0
+        self.total_time = 0.0
+        self.plan = []
+        self.error = None
+
+
+def load_samples(path, limit=None):
+    groups = OrderedDict()
+    with open(path) as handle:
+        for number, line in enumerate(handle):
+            if limit and number >= limit:
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            group = groups.get(record['sql'])
+            if group is None:
+                group = groups[record['sql']] = QueryGroup(record['sql'], record['params'])
+            group.count += 1
+            group.total_time += record.get('duration', 0)
+    return list(groups.values())
+
+
+class PlanStep:
+    def __init__(self, table, full_scan, index=None, rows=None):
+        self.table = table
+        self.full_scan = full_scan
+        self.index = index
+        self.rows = rows
+
+
+SQLITE_PLAN = re.compile(
+    r'^(?P<op>SCAN|SEARCH) (?:TABLE )?(?P<table>\S+)(?: AS \S+)?'
+    r'(?: USING (?:COVERING )?INDEX (?P<index>\S+)| USING (?:INTEGER )?PRIMARY KEY)?'
+)
+
+
+def explain(sql, params, connection=default_connection):
+    """Run EXPLAIN for one query and normalise the plan into PlanSteps"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            steps = []
+            for row in cursor.fetchall():
+                match = SQLITE_PLAN.match(row[-1])
+                if match:
+                    index = match.group('index')
+                    full_scan = match.group('op') == 'SCAN' and not index
+                    steps.append(PlanStep(match.group('table'), full_scan, index))
+            return steps
+
+        if connection.vendor == 'mysql':
+            cursor.execute('EXPLAIN ' + sql, params)
+            columns = [column[0].lower() for column in cursor.description]
+            steps = []
+            for values in cursor.fetchall():
+                row = dict(zip(columns, values))
+                if not row.get('table') or row['table'].startswith('<'):
+                    continue
+                steps.append(PlanStep(row['table'], row.get('type') == 'ALL', row.get('key'), row.get('rows')))
+            return steps
+
+    raise NotImplementedError(f"EXPLAIN is not supported for the {connection.vendor} backend")
+
+
+def table_indexes(table, connection=default_connection):
+    """{index_name: {'columns': [...], 'unique': bool}} for secondary indexes on table"""
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return {
+        name: {'columns': info['columns'], 'unique': info['unique']}
+        for name, info in constraints.items()
+        if info['index'] and not info['primary_key']
+    }
+
+
+def table_rows(table, connection=default_connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(
+                'SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s',
+                [table],
+            )
+            row = cursor.fetchone()
+            return int(row[0] or 0) if row else 0
+        cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}')
+        return cursor.fetchone()[0]
+
+
+PREDICATE = re.compile(
+    r'[`"]?(?P<table>\w+)[`"]?\.[`"](?P<column>\w+)[`"]\s*'
+    r'(?P<op>=|IN\b|>=|<=|<|>|IS NULL|BETWEEN|LIKE)',
+    re.IGNORECASE,
+)
+ORDER_BY = re.compile(r'\bORDER BY\b(?P<clause>.*?)(?:\bLIMIT\b|$)', re.IGNORECASE | re.DOTALL)
+COLUMN = re.compile(r'[`"]?(?P<table>\w+)[`"]?\.[`"](?P<column>\w+)[`"]')
+
+
+def suggest_columns(sql, table):
+    """
+    Composite index columns for the predicates on table: equality columns
+    first, then one range column, then ORDER BY columns
+    """
+    where = re.split(r'\bWHERE\b', sql, maxsplit=1, flags=re.IGNORECASE)
+    if len(where) < 2:
+        return []
+    equality, ranges = [], []
+    clause = re.split(r'\bORDER BY\b|\bGROUP BY\b|\bLIMIT\b', where[1], maxsplit=1, flags=re.IGNORECASE)[0]
+    for match in PREDICATE.finditer(clause):
+        if match.group('table') != table:
+            continue
+        column = match.group('column')
+        target = equality if match.group('op').upper() in ('=', 'IN', 'IS NULL') else ranges
+        if column not in equality and column not in ranges:
+            target.append(column)
+
+    columns = equality + ranges[:1]
+    order = ORDER_BY.search(where[1])
+    if order and not ranges:
+        for match in COLUMN.finditer(order.group('clause')):
+            if match.group('table') == table and match.group('column') not in columns:
+                columns.append(match.group('column'))
+    return columns
+
+
+def model_for_table(table):
+    for model in apps.get_models():
+        if model._meta.db_table == table:
+            return model
+    return None
+
+
+class Suggestion:
+    def __init__(self, table, columns):
+        self.table = table
+        self.columns = columns
+        self.queries = 0
+        self.rows_scanned = 0
+
+    @property
+    def model(self):
+        return model_for_table(self.table)
+
+    def field_names(self):
+        model = self.model
+        by_column = {field.column: field.name for field in model._meta.concrete_fields}
+        return [by_column[column] for column in self.columns]
+
+
+def analyse(groups, connection=default_connection):
+    """
+    EXPLAIN every query group and return (full_scans, unused_indexes, suggestions).
+    Impact is estimated as rows read by full scans across all sampled executions.
+    """
+    full_scans = []
+    used = set()
+    tables = set()
+    suggestions = OrderedDict()
+    row_counts = {}
+
+    for group in groups:
+        try:
+            group.plan = explain(group.sql, group.params, connection)
+        except Exception as exc:  # statements that can't be explained are reported, not fatal
+            group.error = repr(exc)
+            continue
+        for step in group.plan:
+            tables.add(step.table)
+            if step.index:
+                used.add((step.table, step.index))
+            if not step.full_scan:
+                continue
+
+            if step.table not in row_counts:
+                row_counts[step.table] = step.rows or table_rows(step.table, connection)
+            full_scans.append((group, step))
+
+            columns = suggest_columns(group.sql, step.table)
+            if not columns:
+                continue
+            existing = table_indexes(step.table, connection)
+            if any(info['columns'][:len(columns)] == columns for info in existing.values()):
+                continue
+            key = (step.table, tuple(columns))
+            suggestion = suggestions.setdefault(key, Suggestion(step.table, columns))
+            suggestion.queries += group.count
+            suggestion.rows_scanned += group.count * row_counts[step.table]
+
+    unused = []
+    for table in sorted(tables):
+        for name, info in table_indexes(table, connection).items():
+            if (table, name) not in used and not info['unique']:
+                unused.append((table, name, info['columns']))
+
+    ranked = sorted(suggestions.values(), key=lambda s: s.rows_scanned, reverse=True)
+    return full_scans, unused, ranked
@@ -0,0 +1,76 @@
+#core/jobs.py
+# Lease-based claiming and the polling worker command shared by background job models
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+
+# A running job whose heartbeat is older than this is considered abandoned
+LEASE = timedelta(minutes=10)
+
+
+def claim_next_job(model, order_by, lease=LEASE, **updates):
+    """
+    Claim the oldest pending or abandoned job of model for this worker, or
+    return None. model needs status and heartbeat_at fields. The claim is a
+    conditional UPDATE, so two workers can never take the same job; any
+    extra field updates (values or expressions) are applied with it.
+    """
+    now = timezone.now()
+    claimable = Q(status='pending') | Q(status='running', heartbeat_at__lt=now - lease)
+    for job in model.objects.filter(claimable).order_by(order_by)[:10]:
+        if model.objects.filter(claimable, pk=job.pk).update(status='running', heartbeat_at=now, **updates):
+            job.refresh_from_db()
+            return job
+    return None
+
+
+class JobWorkerCommand(BaseCommand):
+    """
+    Management command that claims and runs jobs one at a time.
+    Subclasses set model and implement claim(), run(job, **options),
+    started(job) and finished(job); the last two return log lines.
+    """
+    model = None
+    poll_interval = 10
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new jobs')
+        parser.add_argument('--poll-interval', type=float, default=self.poll_interval)
+        parser.add_argument('--retry-failed', action='store_true', help='Requeue failed jobs first')
+
+    def claim(self):
+        raise NotImplementedError
+
+    def run(self, job, **options):
+        raise NotImplementedError
+
+    def started(self, job):
+        return f"Running {job}"
+
+    def finished(self, job):
+        return f"Done: {job}"
+
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            requeued = self.model.objects.filter(status='failed').update(status='pending', last_error='')
+            self.stdout.write(f"Requeued {requeued} failed jobs")
+
+        while True:
+            job = self.claim()
+            if job is None:
+                if not options['loop']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+
+            self.stdout.write(self.started(job))
+            try:
+                self.run(job, **options)
+            except Exception as exc:
+                self.stderr.write(self.style.ERROR(f"Failed: {exc!r}"))
+                continue
+            self.stdout.write(self.style.SUCCESS(self.finished(job)))
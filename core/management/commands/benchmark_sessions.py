@@ -0,0 +1,65 @@
+#core/management/commands/benchmark_sessions.py
+import time
+from importlib import import_module
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+
+ENGINES = [
+    ('db', 'django.contrib.sessions.backends.db'),
+    ('cached_db', 'django.contrib.sessions.backends.cached_db'),
+    ('local LRU', 'core.session_backend'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Measure session read and write overhead per request for the default and local-LRU session engines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        requests = options['requests']
+        self.stdout.write(f"{requests} simulated requests per scenario (load + save)\n")
+        for label, engine in ENGINES:
+            store_class = import_module(engine).SessionStore
+            session = store_class()
+            session['_auth_user_id'] = '1'
+            session['cart'] = {'items': [1, 2, 3]}
+            session.create()
+            key = session.session_key
+            try:
+                for scenario, mutate in [
+                    ('read only', None),
+                    ('unchanged save', lambda s: s.__setitem__('cart', {'items': [1, 2, 3]})),
+                    ('last_active touch', lambda s: s.__setitem__('last_active', timezone.now().isoformat())),
+                    ('data change', lambda s: s.__setitem__('cart', {'items': [time.perf_counter()]})),
+                ]:
+                    self.run_scenario(label, scenario, store_class, key, mutate, requests)
+            finally:
+                store_class().delete(key)
+
+    def run_scenario(self, label, scenario, store_class, key, mutate, requests):
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            start = time.perf_counter()
+            for _ in range(requests):
+                # Mirrors SessionMiddleware: a fresh store per request, save only when modified
+                session = store_class(key)
+                session.get('_auth_user_id')
+                if mutate:
+                    mutate(session)
+                if session.modified:
+                    session.save()
+            elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"  {label:<10} {scenario:<18} {elapsed / requests * 1e6:8.1f} us/request"
+            f"  {len(queries) / requests:5.2f} queries/request"
+        )
@@ -0,0 +1,94 @@
+#core/management/commands/index_advisor.py
+import os
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, migrations, models
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.writer import MigrationWriter
+
+from core.index_advisor import analyse, load_samples, model_for_table
+
+
+class Command(BaseCommand):
+    help = (
+        'EXPLAIN sampled queries (SQLite and MySQL) and report full table scans, '
+        'unused indexes and suggested composite indexes, optionally as a draft migration'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', default=None, help='Query samples file (default: INDEX_ADVISOR_LOG)')
+        parser.add_argument('--limit', type=int, default=None, help='Read at most this many samples')
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--emit-migration', action='store_true', help='Write a draft migration per app')
+        parser.add_argument('--drop-unused', action='store_true', help='Include RemoveIndex for unused Meta.indexes')
+
+    def handle(self, *args, **options):
+        path = options['log'] or settings.INDEX_ADVISOR_LOG
+        if not os.path.exists(path):
+            raise CommandError(
+                f"No query samples at {path}. Set INDEX_ADVISOR_SAMPLE_RATE or wrap code in core.index_advisor.record_queries()"
+            )
+        connection = connections[options['database']]
+        if connection.vendor not in ('sqlite', 'mysql'):
+            raise CommandError(f"EXPLAIN analysis supports SQLite and MySQL, not {connection.vendor}")
+
+        groups = load_samples(path, options['limit'])
+        self.stdout.write(f"{sum(g.count for g in groups)} samples, {len(groups)} distinct queries")
+        full_scans, unused, suggestions = analyse(groups, connection)
+
+        self.stdout.write(self.style.MIGRATE_HEADING('\nFull table scans'))
+        for group, step in sorted(full_scans, key=lambda item: item[0].count, reverse=True):
+            self.stdout.write(f"  {step.table}: {group.count}x, {group.total_time * 1000:.1f} ms total")
+            self.stdout.write(f"    {group.sql[:200]}")
+        errors = [g for g in groups if g.error]
+        if errors:
+            self.stdout.write(self.style.WARNING(f"  {len(errors)} queries could not be explained"))
+
+        self.stdout.write(self.style.MIGRATE_HEADING('\nUnused indexes (never chosen by any sampled plan)'))
+        for table, name, columns in unused:
+            self.stdout.write(f"  {table}.{name} ({', '.join(columns)})")
+
+        self.stdout.write(self.style.MIGRATE_HEADING('\nSuggested indexes'))
+        for suggestion in suggestions:
+            self.stdout.write(
+                f"  {suggestion.table} ({', '.join(suggestion.columns)}): "
+                f"{suggestion.queries} sampled queries, ~{suggestion.rows_scanned:,} rows scanned that an index would avoid"
+            )
+
+        if options['emit_migration']:
+            self.emit_migrations(suggestions, unused if options['drop_unused'] else [])
+
+    def emit_migrations(self, suggestions, unused):
+        operations = defaultdict(list)
+        for suggestion in suggestions:
+            model = suggestion.model
+            if model is None:
+                continue
+            index = models.Index(fields=suggestion.field_names(), name='')
+            index.set_name_with_model(model)
+            operations[model._meta.app_label].append(
+                migrations.AddIndex(model_name=model._meta.model_name, index=index)
+            )
+        for table, name, _ in unused:
+            model = model_for_table(table)
+            # Only indexes declared in Meta.indexes; others back FKs or constraints
+            if model is not None and any(index.name == name for index in model._meta.indexes):
+                operations[model._meta.app_label].append(
+                    migrations.RemoveIndex(model_name=model._meta.model_name, name=name)
+                )
+
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+        for app_label, app_operations in operations.items():
+            leaves = loader.graph.leaf_nodes(app_label)
+            number = max((int(name.split('_', 1)[0]) for _, name in leaves), default=0) + 1
+            migration = migrations.Migration(f'{number:04d}_index_advisor', app_label)
+            migration.dependencies = leaves
+            migration.operations = app_operations
+            writer = MigrationWriter(migration)
+            with open(writer.path, 'w') as handle:
+                handle.write(writer.as_string())
+            self.stdout.write(self.style.SUCCESS(
+                f"\nDraft migration written to {writer.path}; review it and update Meta.indexes to match"
+            ))
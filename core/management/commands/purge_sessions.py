@@ -0,0 +1,16 @@
+#core/management/commands/purge_sessions.py
+from django.core.management.base import BaseCommand
+
+from core.session_backend import PURGE_CHUNK_SIZE, SessionStore
+
+
+class Command(BaseCommand):
+    help = 'Delete expired sessions in small chunks so the session table is never locked for long'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=PURGE_CHUNK_SIZE)
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to sleep between chunks')
+
+    def handle(self, *args, **options):
+        deleted = SessionStore.clear_expired(chunk_size=options['chunk_size'], pause=options['pause'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired sessions"))
@@ -0,0 +1,21 @@
+#core/management/commands/run_export_jobs.py
+from core.exports import claim_next_job, run_export_job
+from core.jobs import JobWorkerCommand
+from core.models import ExportJob
+
+
+class Command(JobWorkerCommand):
+    help = 'Background worker that writes queued CSV exports to disk, resuming interrupted ones'
+    model = ExportJob
+
+    def claim(self):
+        return claim_next_job()
+
+    def run(self, job, **options):
+        run_export_job(job)
+
+    def started(self, job):
+        return f"Exporting {job.export_name} #{job.pk}, resuming after key {job.last_key}"
+
+    def finished(self, job):
+        return f"Done: {job.rows_written} rows, {job.bytes_written} bytes"
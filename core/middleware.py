@@ -0,0 +1,133 @@
+#core/middleware.py
+# Request/response middleware shared across the project
+import json
+import mimetypes
+import os
+import re
+from contextlib import ExitStack
+from email.utils import formatdate
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+
+from .index_advisor import QueryRecorder, should_sample
+
+
+accepts_gzip = re.compile(r'\bgzip\b')
+
+# Hashed names never change content, so they can be cached for a year
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+DEFAULT_CACHE_CONTROL = 'public, max-age=60'
+
+
+class StaticFile:
+    """A collected static file and its optional precompressed variant"""
+
+    def __init__(self, path, immutable):
+        self.path = path
+        stat = os.stat(path)
+        self.size = stat.st_size
+        self.last_modified = formatdate(stat.st_mtime, usegmt=True)
+        self.etag = f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+        self.content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self.immutable = immutable
+
+        self.gzip_path = path + '.gz'
+        self.gzip_size = os.path.getsize(self.gzip_path) if os.path.exists(self.gzip_path) else None
+
+
+class StaticFilesMiddleware:
+    """
+    Serve collected files from STATIC_ROOT straight from the app process.
+    Content-hashed names from the manifest get far-future immutable caching,
+    and the .gz variant built by collectstatic is sent to clients that accept it.
+    The file index is built once at startup, so a request costs a dict lookup.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        root = settings.STATIC_ROOT
+        if not root or not os.path.isdir(root):
+            raise MiddlewareNotUsed
+        self.prefix = '/' + settings.STATIC_URL.strip('/') + '/'
+        self.files = self.build_index(root)
+
+    def build_index(self, root):
+        manifest_name = getattr(staticfiles_storage, 'manifest_name', 'staticfiles.json')
+        try:
+            with open(os.path.join(root, manifest_name)) as handle:
+                hashed = set(json.load(handle)['paths'].values())
+        except (OSError, ValueError, KeyError):
+            hashed = set()
+
+        files = {}
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, root).replace(os.sep, '/')
+                # .gz variants are only sent via Content-Encoding, never by name
+                if name == manifest_name or name.endswith('.gz'):
+                    continue
+                files[name] = StaticFile(path, immutable=name in hashed)
+        return files
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD') and request.path_info.startswith(self.prefix):
+            static_file = self.files.get(request.path_info[len(self.prefix):])
+            if static_file is not None:
+                return self.serve(request, static_file)
+        return self.get_response(request)
+
+    def serve(self, request, static_file):
+        use_gzip = static_file.gzip_size is not None and bool(
+            accepts_gzip.search(request.headers.get('Accept-Encoding', ''))
+        )
+        etag = static_file.etag[:-1] + '-gz"' if use_gzip else static_file.etag
+
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match and (etag in parse_etags(if_none_match) or if_none_match.strip() == '*'):
+            response = HttpResponseNotModified()
+        elif request.method == 'HEAD':
+            response = HttpResponse(content_type=static_file.content_type)
+            response['Content-Length'] = static_file.gzip_size if use_gzip else static_file.size
+        else:
+            path = static_file.gzip_path if use_gzip else static_file.path
+            response = FileResponse(
+                open(path, 'rb'),
+                content_type=static_file.content_type,
+                filename=os.path.basename(static_file.path),
+            )
+
+        if use_gzip:
+            response['Content-Encoding'] = 'gzip'
+        if static_file.gzip_size is not None:
+            response['Vary'] = 'Accept-Encoding'
+        response['ETag'] = etag
+        response['Last-Modified'] = static_file.last_modified
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if static_file.immutable else DEFAULT_CACHE_CONTROL
+        return response
+
+
+class QuerySampleMiddleware:
+    """
+    Record the queries of a random INDEX_ADVISOR_SAMPLE_RATE fraction of
+    requests for manage.py index_advisor. Disabled when the rate is 0.
+    """
+
+    def __init__(self, get_response):
+        if not settings.INDEX_ADVISOR_SAMPLE_RATE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.recorder = QueryRecorder(settings.INDEX_ADVISOR_LOG)
+
+    def __call__(self, request):
+        if not should_sample():
+            return self.get_response(request)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self.recorder))
+            return self.get_response(request)
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExchangeRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('currency', models.CharField(help_text='ISO 4217 code, e.g. USD', max_length=3, unique=True)),
+                ('rate', models.DecimalField(decimal_places=10, max_digits=20)),
+                ('source', models.CharField(blank=True, help_text='Where the rate was taken from', max_length=50)),
+                ('is_active', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'core_exchange_rate',
+                'ordering': ['currency'],
+            },
+        ),
+    ]
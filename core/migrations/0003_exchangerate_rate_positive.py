@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:43
+
+import django.core.validators
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_exchangerate'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exchangerate',
+            name='rate',
+            field=models.DecimalField(decimal_places=10, help_text='Must be greater than zero', max_digits=20, validators=[django.core.validators.MinValueValidator(Decimal('1E-10'))]),
+        ),
+    ]
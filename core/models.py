@@ -1,3 +1,81 @@
+#core/models.py
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.validators import MinValueValidator
 from django.db import models
 
-# Create your models here.
+
+# Smallest rate the 10 decimal places can hold; a 0 rate would divide by zero
+MIN_RATE = Decimal('0.0000000001')
+
+
+class ExportJob(models.Model):
+    """
+    Large CSV export written to disk by a background worker.
+    Records the last exported key so an interrupted job can resume.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    export_name = models.CharField(max_length=50)
+    params = models.JSONField(default=dict, blank=True)
+    compress = models.BooleanField(default=True)
+    file_name = models.CharField(max_length=255)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='export_jobs'
+    )
+
+    # Progress Tracking
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    last_key = models.BigIntegerField(null=True, blank=True)
+    rows_written = models.PositiveBigIntegerField(default=0)
+    bytes_written = models.PositiveBigIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'core_export_job'
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.export_name} ({self.get_status_display()})"
+
+
+class ExchangeRate(models.Model):
+    """
+    Admin-managed exchange rate: how much of currency one unit of the
+    base currency (settings.CURRENCY_BASE) buys
+    """
+    currency = models.CharField(max_length=3, unique=True, help_text='ISO 4217 code, e.g. USD')
+    rate = models.DecimalField(
+        max_digits=20,
+        decimal_places=10,
+        validators=[MinValueValidator(MIN_RATE)],
+        help_text='Must be greater than zero'
+    )
+    source = models.CharField(max_length=50, blank=True, help_text='Where the rate was taken from')
+    is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'core_exchange_rate'
+        ordering = ['currency']
+
+    def __str__(self):
+        return f"1 {settings.CURRENCY_BASE} = {self.rate} {self.currency}"
+
+    def save(self, *args, **kwargs):
+        self.currency = self.currency.upper()
+        super().save(*args, **kwargs)
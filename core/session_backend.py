@@ -0,0 +1,146 @@
+#core/session_backend.py
+# Session engine: process-local LRU in front of Django's db store
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.db import router, transaction
+from django.utils import timezone
+
+from .cache import LRUCache
+
+
+PURGE_CHUNK_SIZE = 1000
+
+_local = LRUCache(maxsize=settings.SESSION_LOCAL_CACHE_SIZE)
+
+
+class _Entry:
+    __slots__ = ('blob', 'loaded_at', 'persisted_at', 'dirty')
+
+    def __init__(self, blob, loaded_at, persisted_at, dirty=False):
+        self.blob = blob
+        self.loaded_at = loaded_at
+        self.persisted_at = persisted_at
+        self.dirty = dirty
+
+
+class SessionStore(DBStore):
+    """
+    Database sessions with a process-local LRU in front of the table.
+
+    - Loads are served from the LRU for SESSION_LOCAL_CACHE_TTL seconds.
+      The database is the only shared store, so that TTL is the longest
+      another process can keep serving a session that was logged out,
+      cycled or changed elsewhere.
+    - A save whose data is unchanged from what this request loaded is
+      skipped, provided that load (or the last write) is within
+      SESSION_LOCAL_CACHE_TTL seconds; an older read is written through.
+    - A save that only changes SESSION_WRITE_BEHIND_KEYS (last_active style
+      bookkeeping) is kept locally. It is persisted by the next real write,
+      or by the first save after SESSION_WRITE_BEHIND_INTERVAL seconds.
+      Nothing flushes it in between: a pending value is dropped if no
+      further request saves the session, if the entry is evicted, or if
+      the process exits. Only list keys that can afford to lose an update.
+    """
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        # (blob, monotonic time it was read or written) for this request
+        self._seen = None
+
+    def _remember(self, blob, persisted_at, dirty=False):
+        now = time.monotonic()
+        _local.set(self.session_key, _Entry(blob, now, persisted_at, dirty))
+        self._seen = (blob, now)
+
+    def _dumps(self, data):
+        return self.serializer().dumps(data)
+
+    def _loads(self, blob):
+        return self.serializer().loads(blob)
+
+    def load(self):
+        entry = _local.get(self.session_key) if self.session_key else None
+        now = time.monotonic()
+        if entry is not None and now - entry.loaded_at < settings.SESSION_LOCAL_CACHE_TTL:
+            self._seen = (entry.blob, entry.loaded_at)
+            return self._loads(entry.blob)
+
+        data = super().load()
+        if not self.session_key or not data:
+            return data
+
+        if entry is not None and entry.dirty:
+            # Re-apply bookkeeping values this process has not persisted yet
+            pending = self._loads(entry.blob)
+            for key in settings.SESSION_WRITE_BEHIND_KEYS:
+                if key in pending:
+                    data[key] = pending[key]
+            self._remember(self._dumps(data), entry.persisted_at, dirty=True)
+        else:
+            self._remember(self._dumps(data), now)
+        return data
+
+    def _only_write_behind_changes(self, old_blob, data):
+        def without_write_behind(values):
+            return {k: v for k, v in values.items() if k not in settings.SESSION_WRITE_BEHIND_KEYS}
+
+        old = self._loads(old_blob)
+        return without_write_behind(old) == without_write_behind(self._loads(self._dumps(data)))
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+
+        if not must_create:
+            data = self._get_session()
+            blob = self._dumps(data)
+            now = time.monotonic()
+            if self._seen is not None and now - self._seen[1] < settings.SESSION_LOCAL_CACHE_TTL:
+                seen_blob = self._seen[0]
+                if blob == seen_blob:
+                    return
+                entry = _local.get(self.session_key)
+                if (
+                    entry is not None
+                    and entry.blob == seen_blob
+                    and now - entry.persisted_at < settings.SESSION_WRITE_BEHIND_INTERVAL
+                    and self._only_write_behind_changes(seen_blob, data)
+                ):
+                    self._remember(blob, entry.persisted_at, dirty=True)
+                    return
+
+        super().save(must_create)
+        self._remember(self._dumps(self._get_session(no_load=must_create)), time.monotonic())
+
+    def delete(self, session_key=None):
+        key = session_key or self.session_key
+        super().delete(session_key)
+        if key:
+            _local.pop(key)
+        if key == self.session_key:
+            self._seen = None
+
+    @classmethod
+    def clear_expired(cls, chunk_size=PURGE_CHUNK_SIZE, pause=0):
+        """
+        Delete expired sessions in chunks of chunk_size rows, each in its
+        own short transaction, instead of one large DELETE. Returns the
+        number of rows deleted; also used by manage.py clearsessions.
+        """
+        model = cls.get_model_class()
+        using = router.db_for_write(model)
+        now = timezone.now()
+        deleted = 0
+        while True:
+            keys = list(
+                model.objects.using(using).filter(expire_date__lt=now)
+                .values_list('session_key', flat=True)[:chunk_size]
+            )
+            if not keys:
+                return deleted
+            with transaction.atomic(using=using):
+                deleted += model.objects.using(using).filter(session_key__in=keys)._raw_delete(using)
+            if pause:
+                time.sleep(pause)
@@ -0,0 +1,52 @@
+#core/staticfiles.py
+# Content-hashed static files with gzip variants generated at collectstatic time
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage that also writes a .gz file next to every
+    hashed text asset, so the app never compresses static files per request.
+    """
+    # Files missing from the manifest get hashed on the fly when they exist
+    # in STATIC_ROOT, and keep their plain name when they don't (collectstatic
+    # not run, e.g. in tests), instead of raising on every template render
+    manifest_strict = False
+    compress_extensions = ('.css', '.js', '.mjs', '.json', '.map', '.svg', '.txt', '.xml', '.html', '.ico', '.ttf', '.otf', '.eot')
+    # Skip files where gzip overhead is not worth it
+    min_compress_size = 256
+    # Keep the .gz only if it saves at least this fraction of the original
+    min_saving = 0.05
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+
+        if dry_run:
+            return
+        # Only the final names: intermediate passes over CSS leave extra hashed copies
+        for hashed_name in set(self.hashed_files.values()):
+            if hashed_name.endswith(self.compress_extensions):
+                self.compress(hashed_name)
+
+    def compress(self, name):
+        path = self.path(name)
+        with open(path, 'rb') as handle:
+            data = handle.read()
+        if len(data) < self.min_compress_size:
+            return None
+
+        # mtime=0 keeps the output byte-identical between builds
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(compressed) > len(data) * (1 - self.min_saving):
+            return None
+        with open(path + '.gz', 'wb') as handle:
+            handle.write(compressed)
+        return name + '.gz'
@@ -1,3 +1,371 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.sessions.models import Session
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from accounts.models import LoginAttempt, User, UserActivity
+from vendors.exports import VendorActivityExport
+from . import currency
+from .index_advisor import REDACTED, analyse, explain, load_samples, record_queries, redact_params, suggest_columns
+from .exports import CSVExport, export_path, export_response, keyset_iterator, queue_export, run_export_job
+from .middleware import IMMUTABLE_CACHE_CONTROL
+from .models import ExchangeRate
+from .session_backend import SessionStore, _local
+
+
+STYLESHEET = 'body { background: url("../img/logo.svg"); }\n' + '.card { margin: 0 auto; padding: 1rem; }\n' * 40
+SCRIPT = 'console.log("tiny");\n'
+LOGO = '<svg xmlns="http://www.w3.org/2000/svg"></svg>'
+
+
+class StaticPipelineTests(SimpleTestCase):
+    """collectstatic manifest, gzip variants and the headers StaticFilesMiddleware sends"""
+
+    def setUp(self):
+        self.source = tempfile.mkdtemp()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.source)
+        self.addCleanup(shutil.rmtree, self.root)
+        for name, content in [('css/site.css', STYLESHEET), ('js/app.js', SCRIPT), ('img/logo.svg', LOGO)]:
+            path = os.path.join(self.source, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as handle:
+                handle.write(content)
+
+        settings_override = override_settings(
+            STATIC_ROOT=self.root,
+            STATIC_URL='/static/',
+            STATICFILES_DIRS=[self.source],
+            STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+        with open(os.path.join(self.root, 'staticfiles.json')) as handle:
+            self.manifest = json.load(handle)['paths']
+
+    def test_manifest_maps_to_content_hashed_names(self):
+        self.assertRegex(self.manifest['css/site.css'], r'^css/site\.[0-9a-f]{12}\.css$')
+        self.assertRegex(self.manifest['js/app.js'], r'^js/app\.[0-9a-f]{12}\.js$')
+        with open(os.path.join(self.root, self.manifest['css/site.css'])) as handle:
+            self.assertIn(self.manifest['img/logo.svg'].split('/')[-1], handle.read())
+
+    def test_gzip_variants_only_for_compressible_files(self):
+        css = os.path.join(self.root, self.manifest['css/site.css'])
+        self.assertTrue(os.path.exists(css + '.gz'))
+        with open(css, 'rb') as plain, gzip.open(css + '.gz') as compressed:
+            self.assertEqual(plain.read(), compressed.read())
+        # Too small for gzip to pay off
+        self.assertFalse(os.path.exists(os.path.join(self.root, self.manifest['js/app.js']) + '.gz'))
+
+    def test_hashed_file_served_gzipped_and_immutable(self):
+        response = self.client.get('/static/' + self.manifest['css/site.css'], HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Cache-Control'], IMMUTABLE_CACHE_CONTROL)
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertTrue(response['Content-Type'].startswith('text/css'))
+        with open(os.path.join(self.root, self.manifest['css/site.css']), 'rb') as handle:
+            self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), handle.read())
+
+        response = self.client.get(
+            '/static/' + self.manifest['css/site.css'],
+            HTTP_IF_NONE_MATCH=response['ETag'],
+            HTTP_ACCEPT_ENCODING='gzip',
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_identity_encoding_without_accept_encoding(self):
+        response = self.client.get('/static/' + self.manifest['css/site.css'])
+        self.assertFalse(response.has_header('Content-Encoding'))
+        path = os.path.join(self.root, self.manifest['css/site.css'])
+        self.assertEqual(int(response['Content-Length']), os.path.getsize(path))
+
+    def test_gzip_variants_and_manifest_not_served_by_name(self):
+        for name in (self.manifest['css/site.css'] + '.gz', 'staticfiles.json'):
+            self.assertEqual(self.client.get('/static/' + name).status_code, 404)
+
+    def test_missing_manifest_falls_back_to_unhashed_names(self):
+        os.remove(os.path.join(self.root, 'staticfiles.json'))
+        with override_settings(STATIC_ROOT=self.root, DEBUG=False):
+            self.assertEqual(staticfiles_storage.url('admin/css/base.css'), '/static/admin/css/base.css')
+
+    def test_unhashed_name_gets_short_cache(self):
+        response = self.client.get('/static/css/site.css')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+
+class CSVFormulaEscapeTests(SimpleTestCase):
+    def test_formula_cells_are_quoted(self):
+        export = CSVExport()
+        data = export._encode([['=HYPERLINK("http://x")', '+254700000000', '-1+2', '@SUM(A1)', 'Shop', -5, 3]])
+        self.assertEqual(
+            data.decode(),
+            '"\'=HYPERLINK(""http://x"")",\'+254700000000,\'-1+2,\'@SUM(A1),Shop,-5,3\r\n',
+        )
+
+
+class CSVExportTests(TestCase):
+    """Keyset paging, gzip streaming and resumable background export files"""
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        settings_override = override_settings(EXPORT_ROOT=root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create(username='vendor', email='vendor@example.com', phone_number='+254700000030')
+        for i in range(7):
+            UserActivity.objects.record(self.user, 'search', '10.0.0.1', description=f'query {i}')
+
+    def export(self, chunk_size=3):
+        export = VendorActivityExport(user_id=self.user.pk)
+        export.chunk_size = chunk_size
+        return export
+
+    def test_keyset_pages_cover_every_row_once(self):
+        expected = list(UserActivity.objects.order_by('pk').values_list('pk', flat=True))
+        for chunk_size in (1, 3, 7, 10):
+            with self.subTest(chunk_size=chunk_size):
+                pages = list(keyset_iterator(UserActivity.objects.all(), chunk_size))
+                self.assertTrue(all(len(page) <= chunk_size for page in pages))
+                self.assertEqual([obj.pk for page in pages for obj in page], expected)
+
+        rows = sum(count for _, count, _ in self.export(chunk_size=3).pages())
+        self.assertEqual(rows, 7)
+
+    def test_gzip_stream_decodes_to_the_plain_csv(self):
+        plain = b''.join(self.export().stream())
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        response = export_response(request, self.export())
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), plain)
+        self.assertEqual(plain.decode().count('query '), 7)
+
+    def test_resume_after_crash_neither_duplicates_nor_loses_rows(self):
+        expected = b''.join(self.export().stream())
+        for compress in (True, False):
+            with self.subTest(compress=compress):
+                job = queue_export(self.export(), self.user, compress=compress)
+                pages = []
+
+                def crash_after_second_page(job):
+                    pages.append(job.last_key)
+                    if len(pages) == 2:
+                        raise RuntimeError('worker killed')
+
+                with mock.patch.object(VendorActivityExport, 'chunk_size', 3):
+                    with self.assertRaises(RuntimeError):
+                        run_export_job(job, on_page=crash_after_second_page)
+                    # A third page written to disk but never recorded
+                    with open(export_path(job), 'ab') as handle:
+                        handle.write(b'torn page')
+
+                    job.refresh_from_db()
+                    self.assertEqual((job.status, job.rows_written), ('failed', 6))
+                    job.status = 'pending'
+                    job.save()
+                    run_export_job(job)
+
+                job.refresh_from_db()
+                self.assertEqual((job.status, job.rows_written), ('completed', 7))
+                with open(export_path(job), 'rb') as handle:
+                    data = handle.read()
+                self.assertEqual(gzip.decompress(data) if compress else data, expected)
+
+
+@override_settings(CURRENCY_BASE='KES', CURRENCY_RATES_FILE=None)
+class CurrencyConversionTests(TestCase):
+    """Rounding to minor units and picking up rate changes made elsewhere"""
+
+    def setUp(self):
+        ExchangeRate.objects.bulk_create([
+            ExchangeRate(currency='USD', rate=Decimal('0.0077')),
+            ExchangeRate(currency='JPY', rate=Decimal('1.15')),
+            ExchangeRate(currency='KWD', rate=Decimal('0.002375')),
+        ])
+        currency.invalidate_rates()
+
+    def test_rounds_half_up_to_two_decimals(self):
+        # 1950 * 0.0077 = 15.015 exactly
+        self.assertEqual(currency.convert_prices([1950, '100', None], 'usd'), [Decimal('15.02'), Decimal('0.77'), None])
+
+    def test_zero_and_three_decimal_currencies(self):
+        self.assertEqual(currency.convert_prices([Decimal('999')], 'JPY'), [Decimal('1149')])
+        self.assertEqual(currency.convert_prices([Decimal('999')], 'KWD'), [Decimal('2.373')])
+
+    def test_float_amounts_have_no_binary_noise(self):
+        self.assertEqual(currency.convert_price(0.1, 'KES'), Decimal('0.10'))
+
+    def test_cross_rate_between_non_base_currencies(self):
+        # 10 USD -> KES -> JPY = 10 / 0.0077 * 1.15
+        self.assertEqual(currency.convert_price(10, 'JPY', from_currency='USD'), Decimal('1494'))
+
+    def test_unknown_currency_raises(self):
+        with self.assertRaises(currency.UnknownCurrency):
+            currency.convert_prices([1], 'XYZ')
+
+    def test_reloads_after_change_by_another_process(self):
+        self.assertEqual(currency.convert_price(100, 'USD'), Decimal('0.77'))
+        # No signal fires for queryset.update(), as with a write from another worker
+        ExchangeRate.objects.filter(currency='USD').update(rate=Decimal('0.008'), updated_at=timezone.now())
+        self.assertEqual(currency.convert_price(100, 'USD'), Decimal('0.77'))
+        currency._state['checked_at'] = float('-inf')
+        self.assertEqual(currency.convert_price(100, 'USD'), Decimal('0.80'))
+
+    def test_non_positive_rates_rejected_and_ignored(self):
+        for rate in ('0', '-1.5'):
+            with self.subTest(rate=rate), self.assertRaises(ValidationError):
+                ExchangeRate(currency='EUR', rate=Decimal(rate)).full_clean()
+
+        # Written around validation, e.g. by a bulk update
+        ExchangeRate.objects.filter(currency='USD').update(rate=Decimal('0'), updated_at=timezone.now())
+        currency.invalidate_rates()
+        with self.assertRaises(currency.UnknownCurrency):
+            currency.convert_price(1, 'KES', from_currency='USD')
+        self.assertEqual(currency.convert_price(100, 'JPY'), Decimal('115'))
+
+    def test_deleted_rate_disappears(self):
+        currency.convert_price(100, 'USD')
+        ExchangeRate.objects.filter(currency='USD').delete()
+        currency._state['checked_at'] = float('-inf')
+        with self.assertRaises(currency.UnknownCurrency):
+            currency.convert_price(100, 'USD')
+
+
+class IndexAdvisorTests(TestCase):
+    def record(self, queryset):
+        handle = tempfile.NamedTemporaryFile(suffix='.jsonl', delete=False)
+        handle.close()
+        self.addCleanup(os.remove, handle.name)
+        with record_queries(handle.name):
+            list(queryset)
+        return handle.name
+
+    def test_redact_params_keeps_only_non_identifying_values(self):
+        params = [
+            'someone@example.com', '254712345678', 'x' * 32, b'blob',
+            7, 1.5, True, None,
+            '2026-10-19', '2026-10-19 02:43:00.123456', '2026-10-19T02:43:00+00:00', '12:30:00',
+        ]
+        self.assertEqual(redact_params(params), [REDACTED] * 4 + params[4:])
+
+    def test_datetime_predicates_survive_recording(self):
+        since = timezone.now()
+        path = self.record(UserActivity.objects.filter(timestamp__gte=since, description='secret'))
+        [group] = load_samples(path)
+        self.assertEqual(sorted(param[:10] for param in group.params), [since.strftime('%Y-%m-%d'), REDACTED[:10]])
+        # The recorded sample must still be explainable
+        self.assertTrue(explain(group.sql, group.params))
+
+    def test_suggest_columns_orders_equality_range_then_sort(self):
+        sql = str(
+            LoginAttempt.objects.filter(timestamp__gte=timezone.now(), user_id=3, email_or_username='x').query
+        )
+        self.assertEqual(suggest_columns(sql, 'accounts_login_attempt'), ['email_or_username', 'user_id', 'timestamp'])
+
+        sql = str(LoginAttempt.objects.filter(email_or_username='x').order_by('timestamp').query)
+        self.assertEqual(suggest_columns(sql, 'accounts_login_attempt'), ['email_or_username', 'timestamp'])
+
+    def test_explain_and_analyse_on_sqlite(self):
+        scan = self.record(LoginAttempt.objects.filter(email_or_username='someone'))
+        [group] = load_samples(scan)
+        [step] = explain(group.sql, group.params)
+        self.assertEqual((step.table, step.full_scan), ('accounts_login_attempt', True))
+
+        full_scans, _, suggestions = analyse([group], connection)
+        self.assertEqual(len(full_scans), 1)
+        self.assertEqual([(s.table, s.columns) for s in suggestions], [('accounts_login_attempt', ['email_or_username'])])
+
+        lookup = self.record(LoginAttempt.objects.filter(pk=1))
+        [group] = load_samples(lookup)
+        self.assertFalse(any(step.full_scan for step in explain(group.sql, group.params)))
+
+
+
+class SessionStoreTests(TestCase):
+    def setUp(self):
+        _local.clear()
+        store = SessionStore()
+        store.update({'cart': [1], 'last_active': 1})
+        store.create()
+        self.key = store.session_key
+
+    def stored(self):
+        return SessionStore().decode(Session.objects.get(session_key=self.key).session_data)
+
+    def test_unchanged_save_is_skipped(self):
+        store = SessionStore(self.key)
+        store['cart']
+        with self.assertNumQueries(0):
+            store.save()
+
+        with override_settings(SESSION_LOCAL_CACHE_TTL=0):
+            store = SessionStore(self.key)
+            store['cart']
+            with CaptureQueriesContext(connection) as queries:
+                store.save()
+            self.assertTrue(any(q['sql'].startswith('UPDATE') for q in queries.captured_queries))
+
+    def test_skip_compares_against_this_requests_read(self):
+        first = SessionStore(self.key)
+        first['cart']
+        second = SessionStore(self.key)
+        second['cart'] = [1, 2]
+        second.save()
+
+        # first changes cart to what second wrote, relative to its own read
+        first['cart'] = [1, 2]
+        first['coupon'] = 'X'
+        first.save()
+        self.assertEqual(self.stored()['coupon'], 'X')
+
+    def test_write_behind_is_reapplied_after_reload(self):
+        store = SessionStore(self.key)
+        store['last_active'] = 2
+        with self.assertNumQueries(0):
+            store.save()
+        self.assertEqual(self.stored()['last_active'], 1)
+
+        with override_settings(SESSION_LOCAL_CACHE_TTL=0):
+            reloaded = SessionStore(self.key)
+            self.assertEqual(reloaded['last_active'], 2)
+
+        # The next real write persists the pending value
+        store = SessionStore(self.key)
+        store['cart'] = []
+        store.save()
+        self.assertEqual(self.stored(), {'cart': [], 'last_active': 2})
+
+    def test_delete_invalidates_the_local_copy(self):
+        SessionStore(self.key)['cart']
+        SessionStore(self.key).delete()
+        self.assertNotIn(self.key, _local)
+        self.assertEqual(SessionStore(self.key).load(), {})
+
+    def test_clear_expired_deletes_in_chunks(self):
+        past = timezone.now() - timedelta(days=1)
+        Session.objects.bulk_create(
+            Session(session_key=f'expired{i}', session_data='', expire_date=past) for i in range(5)
+        )
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(SessionStore.clear_expired(chunk_size=2), 5)
+        deletes = [q for q in queries.captured_queries if q['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 3)
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), [self.key])
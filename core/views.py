@@ -1,3 +1,34 @@
-from django.shortcuts import render
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, Http404, JsonResponse
+from django.shortcuts import get_object_or_404
 
-# Create your views here.
+from .exports import export_path
+from .models import ExportJob
+
+
+def _get_job(request, pk):
+    job = get_object_or_404(ExportJob, pk=pk)
+    if job.created_by_id != request.user.pk and not request.user.is_staff:
+        raise Http404
+    return job
+
+
+@login_required
+def export_job_status(request, pk):
+    job = _get_job(request, pk)
+    return JsonResponse({
+        'job_id': job.pk,
+        'export': job.export_name,
+        'status': job.status,
+        'rows_written': job.rows_written,
+        'completed_at': job.completed_at,
+    })
+
+
+@login_required
+def export_job_download(request, pk):
+    job = _get_job(request, pk)
+    if job.status != 'completed':
+        raise Http404('Export is not ready yet')
+    filename = job.file_name.rsplit('/', 1)[-1].split('-', 1)[-1]
+    return FileResponse(open(export_path(job), 'rb'), as_attachment=True, filename=filename)
@@ -0,0 +1 @@
+urlpatterns = []
@@ -1,3 +1,19 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import MpesaCallback, TokenPurchase
+
+
+@admin.register(TokenPurchase)
+class TokenPurchaseAdmin(admin.ModelAdmin):
+    list_display = ['checkout_request_id', 'vendor', 'tokens', 'amount', 'status', 'created_at', 'completed_at']
+    list_filter = ['status']
+    search_fields = ['checkout_request_id', 'mpesa_receipt_number', 'phone_number']
+    raw_id_fields = ['vendor']
+
+
+@admin.register(MpesaCallback)
+class MpesaCallbackAdmin(admin.ModelAdmin):
+    list_display = ['checkout_request_id', 'result_code', 'receipt_number', 'amount', 'status', 'received_at']
+    list_filter = ['status', 'result_code']
+    search_fields = ['checkout_request_id', 'receipt_number']
+    readonly_fields = ['payload']
@@ -0,0 +1,51 @@
+#payments/management/commands/process_mpesa_callbacks.py
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from payments.mpesa import BATCH_SIZE, mark_orphans, process_batch
+
+
+class Command(BaseCommand):
+    help = 'Worker pool that applies stored M-Pesa callbacks as token credits, in batches per vendor shard'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Worker threads; vendors are sharded by id')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new callbacks')
+        parser.add_argument('--poll-interval', type=float, default=1)
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        while True:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                processed = sum(pool.map(
+                    lambda worker: self.drain(worker, workers, options['batch_size']), range(workers)
+                ))
+            orphaned = mark_orphans()
+            if processed or orphaned:
+                elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f"Processed {processed} callbacks in {elapsed:.2f}s "
+                    f"({processed / elapsed:,.0f}/s), {orphaned} orphaned"
+                )
+            if not options['loop']:
+                break
+            if not processed:
+                time.sleep(options['poll_interval'])
+
+    def drain(self, worker, workers, batch_size):
+        """Process this worker's shard until it is empty"""
+        processed = 0
+        try:
+            while True:
+                count = process_batch(worker, workers, batch_size)
+                if not count:
+                    return processed
+                processed += count
+        finally:
+            # Each thread has its own connection; don't leak it
+            connections.close_all()
@@ -0,0 +1,134 @@
+#payments/management/commands/replay_mpesa_callbacks.py
+import json
+import random
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User, VendorProfile
+from payments.models import TokenPurchase
+from payments.mpesa import build_stk_callback
+
+
+TOKEN_PRICE = Decimal('10.00')
+
+
+class Command(BaseCommand):
+    help = (
+        'Local load-test stub: create pending token purchases, then replay their STK callbacks '
+        'with duplicates and in random order against the intake endpoint. Use a development database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--purchases', type=int, default=2000)
+        parser.add_argument('--vendors', type=int, default=20)
+        parser.add_argument('--duplicates', type=int, default=3, help='Deliveries per callback')
+        parser.add_argument('--failure-rate', type=float, default=0.1)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--url', help='POST to a running server instead of the in-process test client')
+        parser.add_argument('--process', action='store_true', help='Run the worker pool afterwards and check balances')
+        parser.add_argument('--workers', type=int, default=4, help='Worker pool size for --process (use 1 on SQLite)')
+
+    def handle(self, *args, **options):
+        token = settings.MPESA_CALLBACK_TOKEN
+        if not token:
+            raise CommandError('Set MPESA_CALLBACK_TOKEN; the callback endpoint rejects everything without it')
+        vendors = self.load_test_vendors(options['vendors'])
+        before = dict(VendorProfile.objects.filter(pk__in=[v.pk for v in vendors]).values_list('pk', 'token_balance'))
+
+        expected = defaultdict(int)
+        deliveries = []
+        now = timezone.now()
+        purchases = []
+        for i in range(options['purchases']):
+            vendor = random.choice(vendors)
+            tokens = random.choice([10, 50, 100])
+            purchases.append(TokenPurchase(
+                vendor=vendor,
+                tokens=tokens,
+                amount=tokens * TOKEN_PRICE,
+                phone_number=vendor.business_phone,
+                checkout_request_id=f'ws_CO_LOADTEST_{uuid.uuid4().hex}',
+                merchant_request_id=f'LOADTEST-{i}',
+            ))
+        TokenPurchase.objects.bulk_create(purchases, batch_size=1000)
+
+        for purchase in purchases:
+            success = random.random() >= options['failure_rate']
+            if success:
+                expected[purchase.vendor_id] += purchase.tokens
+            body = json.dumps(build_stk_callback(
+                purchase.checkout_request_id,
+                result_code=0 if success else 1032,
+                amount=purchase.amount,
+                phone=purchase.phone_number,
+                receipt=uuid.uuid4().hex[:10].upper(),
+                transaction_date=now,
+                merchant_request_id=purchase.merchant_request_id,
+            ))
+            deliveries.extend([body] * options['duplicates'])
+        random.shuffle(deliveries)
+
+        post = self.http_poster(options['url']) if options['url'] else self.client_poster(token)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            statuses = list(pool.map(post, deliveries))
+        elapsed = time.perf_counter() - start
+        rejected = sum(1 for status in statuses if status != 200)
+        self.stdout.write(
+            f"Delivered {len(deliveries)} callbacks ({options['purchases']} unique) in {elapsed:.2f}s: "
+            f"{len(deliveries) / elapsed:,.0f}/s, {rejected} non-200 responses"
+        )
+
+        if options['process']:
+            call_command('process_mpesa_callbacks', workers=options['workers'], stdout=self.stdout)
+            after = dict(VendorProfile.objects.filter(pk__in=before).values_list('pk', 'token_balance'))
+            wrong = [pk for pk in before if after[pk] - before[pk] != expected[pk]]
+            if wrong:
+                self.stderr.write(self.style.ERROR(f"Balance mismatch for vendors {wrong}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f"All {len(before)} vendor balances credited exactly once ({sum(expected.values())} tokens)"
+                ))
+
+    def load_test_vendors(self, count):
+        vendors = list(VendorProfile.objects.filter(user__username__startswith='loadtest_vendor_')[:count])
+        for i in range(len(vendors), count):
+            user = User.objects.create(
+                username=f'loadtest_vendor_{uuid.uuid4().hex[:8]}',
+                phone_number=f'+2547{random.randint(10 ** 7, 10 ** 8 - 1)}',
+                user_type='vendor',
+                is_active=False,
+            )
+            vendors.append(user.vendor_profile)
+        return vendors
+
+    def client_poster(self, token):
+        path = reverse('payments:mpesa_callback', kwargs={'token': token})
+
+        def post(body):
+            client = Client(HTTP_HOST='localhost')
+            try:
+                return client.post(path, body, content_type='application/json').status_code
+            finally:
+                connections.close_all()
+        return post
+
+    def http_poster(self, url):
+        import requests
+
+        session = requests.Session()
+
+        def post(body):
+            return session.post(url, data=body, headers={'Content-Type': 'application/json'}, timeout=30).status_code
+        return post
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('accounts', '0005_accountdeletion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MpesaCallback',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('checkout_request_id', models.CharField(max_length=100, unique=True)),
+                ('merchant_request_id', models.CharField(blank=True, max_length=100)),
+                ('result_code', models.IntegerField()),
+                ('result_desc', models.CharField(blank=True, max_length=255)),
+                ('receipt_number', models.CharField(blank=True, max_length=20)),
+                ('amount', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('phone_number', models.CharField(blank=True, max_length=15)),
+                ('transaction_date', models.DateTimeField(blank=True, null=True)),
+                ('payload', models.JSONField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('applied', 'Applied'), ('failed', 'Payment Failed'), ('rejected', 'Rejected'), ('orphaned', 'No Matching Purchase')], default='pending', max_length=10)),
+                ('note', models.CharField(blank=True, max_length=255)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'payments_mpesa_callback',
+                'indexes': [models.Index(fields=['status', 'received_at'], name='payments_mp_status_2c7596_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TokenPurchase',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tokens', models.PositiveIntegerField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('phone_number', models.CharField(max_length=15)),
+                ('checkout_request_id', models.CharField(max_length=100, unique=True)),
+                ('merchant_request_id', models.CharField(blank=True, max_length=100)),
+                ('mpesa_receipt_number', models.CharField(blank=True, max_length=20)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('vendor', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='token_purchases', to='accounts.vendorprofile')),
+            ],
+            options={
+                'db_table': 'payments_token_purchase',
+                'indexes': [models.Index(fields=['vendor', 'status'], name='payments_to_vendor__18a56e_idx')],
+            },
+        ),
+    ]
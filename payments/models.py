@@ -1,3 +1,87 @@
+# payments/models.py
 from django.db import models
 
-# Create your models here.
+from accounts.models import VendorProfile
+
+
+class TokenPurchase(models.Model):
+    """
+    A vendor's marketing token purchase, created when the M-Pesa STK push
+    is sent and completed when its callback is applied
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    # Kept after the vendor is deleted for financial records
+    vendor = models.ForeignKey(
+        VendorProfile,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='token_purchases'
+    )
+    tokens = models.PositiveIntegerField()
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    phone_number = models.CharField(max_length=15)
+
+    # M-Pesa References
+    checkout_request_id = models.CharField(max_length=100, unique=True)
+    merchant_request_id = models.CharField(max_length=100, blank=True)
+    mpesa_receipt_number = models.CharField(max_length=20, blank=True)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'payments_token_purchase'
+        indexes = [
+            models.Index(fields=['vendor', 'status']),
+        ]
+
+    def __str__(self):
+        return f"{self.tokens} tokens for {self.vendor_id} ({self.get_status_display()})"
+
+
+class MpesaCallback(models.Model):
+    """
+    Raw STK push callback as received. The unique CheckoutRequestID makes
+    provider retries a no-op at insert time; credits are applied later by
+    the process_mpesa_callbacks workers.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('applied', 'Applied'),
+        ('failed', 'Payment Failed'),
+        ('rejected', 'Rejected'),
+        ('orphaned', 'No Matching Purchase'),
+    ]
+
+    checkout_request_id = models.CharField(max_length=100, unique=True)
+    merchant_request_id = models.CharField(max_length=100, blank=True)
+    result_code = models.IntegerField()
+    result_desc = models.CharField(max_length=255, blank=True)
+
+    # Callback Metadata (successful payments only)
+    receipt_number = models.CharField(max_length=20, blank=True)
+    amount = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    phone_number = models.CharField(max_length=15, blank=True)
+    transaction_date = models.DateTimeField(null=True, blank=True)
+    payload = models.JSONField()
+
+    # Processing
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    note = models.CharField(max_length=255, blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'payments_mpesa_callback'
+        indexes = [
+            models.Index(fields=['status', 'received_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.checkout_request_id} ({self.get_status_display()})"
@@ -0,0 +1,183 @@
+# payments/mpesa.py
+# M-Pesa STK push callback parsing and batched token crediting
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from zoneinfo import ZoneInfo
+
+from django.db import transaction
+from django.db.models import F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from accounts.models import VendorProfile
+from .models import MpesaCallback, TokenPurchase
+
+
+# Daraja reports TransactionDate as local Nairobi time, e.g. 20191219102115
+MPESA_TIMEZONE = ZoneInfo('Africa/Nairobi')
+BATCH_SIZE = 500
+# Callbacks still without a TokenPurchase after this long are set aside
+ORPHAN_AFTER = timedelta(hours=1)
+
+
+class InvalidCallback(ValueError):
+    pass
+
+
+def parse_stk_callback(payload):
+    """
+    Validate a Daraja STK callback body and return MpesaCallback field values.
+    Raises InvalidCallback when required fields are missing or malformed.
+    """
+    try:
+        callback = payload['Body']['stkCallback']
+        fields = {
+            'checkout_request_id': str(callback['CheckoutRequestID']),
+            'merchant_request_id': str(callback.get('MerchantRequestID', '')),
+            'result_code': int(callback['ResultCode']),
+            'result_desc': str(callback.get('ResultDesc', ''))[:255],
+        }
+    except (KeyError, TypeError, ValueError) as exc:
+        raise InvalidCallback(f"Malformed STK callback: {exc!r}")
+    if not fields['checkout_request_id'] or len(fields['checkout_request_id']) > 100:
+        raise InvalidCallback('Invalid CheckoutRequestID')
+
+    if fields['result_code'] == 0:
+        try:
+            items = {item['Name']: item.get('Value') for item in callback['CallbackMetadata']['Item']}
+            fields['amount'] = Decimal(str(items['Amount']))
+            fields['receipt_number'] = str(items['MpesaReceiptNumber'])[:20]
+            fields['phone_number'] = str(items.get('PhoneNumber', ''))[:15]
+            fields['transaction_date'] = datetime.strptime(
+                str(items['TransactionDate']), '%Y%m%d%H%M%S'
+            ).replace(tzinfo=MPESA_TIMEZONE)
+        except (KeyError, TypeError, ValueError, InvalidOperation) as exc:
+            raise InvalidCallback(f"Malformed CallbackMetadata: {exc!r}")
+    return fields
+
+
+def build_stk_callback(checkout_request_id, result_code=0, amount=None, phone='', receipt='',
+                       transaction_date=None, merchant_request_id=''):
+    """
+    Daraja-shaped STK callback body, the inverse of parse_stk_callback.
+    Used by the tests and the replay_mpesa_callbacks load test.
+    """
+    callback = {
+        'MerchantRequestID': merchant_request_id,
+        'CheckoutRequestID': checkout_request_id,
+        'ResultCode': result_code,
+        'ResultDesc': 'The service request is processed successfully.' if result_code == 0 else 'Request cancelled by user',
+    }
+    if result_code == 0:
+        paid_at = (transaction_date or timezone.now()).astimezone(MPESA_TIMEZONE)
+        callback['CallbackMetadata'] = {'Item': [
+            {'Name': 'Amount', 'Value': float(amount)},
+            {'Name': 'MpesaReceiptNumber', 'Value': receipt},
+            {'Name': 'TransactionDate', 'Value': int(paid_at.strftime('%Y%m%d%H%M%S'))},
+            {'Name': 'PhoneNumber', 'Value': int(normalize_phone(str(phone)))},
+        ]}
+    return {'Body': {'stkCallback': callback}}
+
+
+def normalize_phone(number):
+    """Digits in 2547XXXXXXXX form, whether written +2547..., 2547... or 07..."""
+    digits = re.sub(r'\D', '', number or '')
+    if digits.startswith('0'):
+        digits = '254' + digits[1:]
+    return digits
+
+
+def record_callback(payload):
+    """
+    Persist a verified callback. A retry of an already stored callback is
+    dropped by the unique CheckoutRequestID inside the same single INSERT.
+    """
+    fields = parse_stk_callback(payload)
+    MpesaCallback.objects.bulk_create([MpesaCallback(payload=payload, **fields)], ignore_conflicts=True)
+    return fields['checkout_request_id']
+
+
+def pending_for_shard(worker, workers):
+    """
+    Pending callbacks whose purchase belongs to this worker's vendors.
+    Sharding on vendor id keeps each vendor's credits on a single worker.
+    """
+    vendor = TokenPurchase.objects.filter(checkout_request_id=OuterRef('checkout_request_id')).values('vendor_id')[:1]
+    queryset = MpesaCallback.objects.filter(status='pending').annotate(vendor_id=Subquery(vendor, output_field=IntegerField()))
+    if workers > 1:
+        queryset = queryset.annotate(shard=F('vendor_id') % workers).filter(shard=worker)
+    else:
+        queryset = queryset.filter(vendor_id__isnull=False)
+    return queryset.order_by('vendor_id', 'transaction_date', 'pk')
+
+
+def process_batch(worker=0, workers=1, batch_size=BATCH_SIZE):
+    """
+    Apply one batch of pending callbacks in a single transaction: purchases
+    are completed or failed, and each vendor gets one UPDATE adding up all
+    of its credits. Returns the number of callbacks processed.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        callbacks = list(pending_for_shard(worker, workers).select_for_update(skip_locked=True)[:batch_size])
+        if not callbacks:
+            return 0
+        purchases = TokenPurchase.objects.select_for_update().in_bulk(
+            [callback.checkout_request_id for callback in callbacks], field_name='checkout_request_id'
+        )
+
+        credits = defaultdict(int)
+        latest = {}
+        for callback in callbacks:
+            purchase = purchases[callback.checkout_request_id]
+            callback.processed_at = now
+            if purchase.status != 'pending':
+                callback.status, callback.note = 'rejected', f"Purchase already {purchase.status}"
+            elif callback.result_code != 0:
+                callback.status = 'failed'
+                purchase.status = 'failed'
+                purchase.completed_at = now
+            elif callback.amount < purchase.amount:
+                callback.status, callback.note = 'rejected', f"Paid {callback.amount}, expected {purchase.amount}"
+                purchase.status = 'failed'
+                purchase.completed_at = now
+            elif normalize_phone(callback.phone_number) != normalize_phone(purchase.phone_number):
+                callback.status, callback.note = 'rejected', f"Paid from {callback.phone_number or 'unknown number'}"
+                purchase.status = 'failed'
+                purchase.completed_at = now
+            else:
+                callback.status = 'applied'
+                purchase.status = 'completed'
+                purchase.completed_at = now
+                purchase.mpesa_receipt_number = callback.receipt_number
+                credits[purchase.vendor_id] += purchase.tokens
+                paid_at = callback.transaction_date or now
+                latest[purchase.vendor_id] = max(latest.get(purchase.vendor_id, paid_at), paid_at)
+
+        for vendor_id, tokens in credits.items():
+            VendorProfile.objects.filter(pk=vendor_id).update(
+                token_balance=F('token_balance') + tokens,
+                total_tokens_purchased=F('total_tokens_purchased') + tokens,
+                last_token_purchase=Greatest(Coalesce('last_token_purchase', latest[vendor_id]), latest[vendor_id]),
+            )
+        TokenPurchase.objects.bulk_update(
+            purchases.values(), ['status', 'completed_at', 'mpesa_receipt_number'], batch_size=batch_size
+        )
+        MpesaCallback.objects.bulk_update(callbacks, ['status', 'note', 'processed_at'], batch_size=batch_size)
+    return len(callbacks)
+
+
+def mark_orphans(older_than=ORPHAN_AFTER):
+    """
+    Set aside pending callbacks that never got a matching TokenPurchase, or
+    whose vendor no longer exists, so they don't sit in the queue forever
+    """
+    now = timezone.now()
+    matched = TokenPurchase.objects.filter(vendor__isnull=False).values('checkout_request_id')
+    return (
+        MpesaCallback.objects.filter(status='pending', received_at__lt=now - older_than)
+        .exclude(checkout_request_id__in=matched)
+        .update(status='orphaned', note='No TokenPurchase for an existing vendor', processed_at=now)
+    )
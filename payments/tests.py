@@ -1,3 +1,156 @@
-from django.test import TestCase
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+from functools import partial
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from .models import MpesaCallback, TokenPurchase
+from .mpesa import MPESA_TIMEZONE, build_stk_callback, mark_orphans, process_batch, record_callback
+
+
+# Defaults for a successful 500 KES payment from the vendor's own phone
+stk_callback = partial(
+    build_stk_callback,
+    amount='500',
+    phone=254712345678,
+    receipt='QFT12345AB',
+    transaction_date=datetime(2026, 10, 19, 10, 21, 15, tzinfo=MPESA_TIMEZONE),
+    merchant_request_id='29115-34620561-1',
+)
+
+
+class CallbackProcessingTests(TestCase):
+    """Callback dedup, crediting in batches and orphan handling"""
+
+    def setUp(self):
+        user = User.objects.create(
+            username='vendor1', email='vendor1@example.com', phone_number='+254712345678', user_type='vendor'
+        )
+        self.vendor = user.vendor_profile
+
+    def purchase(self, checkout_request_id, tokens=50, amount='500'):
+        return TokenPurchase.objects.create(
+            vendor=self.vendor,
+            tokens=tokens,
+            amount=Decimal(amount),
+            phone_number='0712345678',
+            checkout_request_id=checkout_request_id,
+        )
+
+    def test_duplicate_deliveries_credit_once(self):
+        purchase = self.purchase('ws_CO_1')
+        for _ in range(3):
+            record_callback(stk_callback('ws_CO_1'))
+        self.assertEqual(MpesaCallback.objects.count(), 1)
+
+        self.assertEqual(process_batch(), 1)
+        self.assertEqual(process_batch(), 0)
+        self.vendor.refresh_from_db()
+        purchase.refresh_from_db()
+        self.assertEqual(self.vendor.token_balance, 50)
+        self.assertEqual(self.vendor.total_tokens_purchased, 50)
+        self.assertEqual(purchase.status, 'completed')
+        self.assertEqual(purchase.mpesa_receipt_number, 'QFT12345AB')
+
+    def test_batch_sums_credits_per_vendor(self):
+        for i, tokens in enumerate([10, 50, 100]):
+            self.purchase(f'ws_CO_{i}', tokens=tokens, amount='100')
+            record_callback(stk_callback(f'ws_CO_{i}', amount='100', receipt=f'R{i}'))
+        self.purchase('ws_CO_cancelled')
+        record_callback(stk_callback('ws_CO_cancelled', result_code=1032))
+
+        self.assertEqual(process_batch(), 4)
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.token_balance, 160)
+        self.assertEqual(TokenPurchase.objects.get(checkout_request_id='ws_CO_cancelled').status, 'failed')
+        self.assertEqual(MpesaCallback.objects.get(checkout_request_id='ws_CO_cancelled').status, 'failed')
+
+    def test_underpayment_and_wrong_payer_are_rejected(self):
+        self.purchase('ws_CO_short')
+        record_callback(stk_callback('ws_CO_short', amount='1'))
+        self.purchase('ws_CO_other_phone')
+        record_callback(stk_callback('ws_CO_other_phone', phone=254799999999))
+
+        process_batch()
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.token_balance, 0)
+        self.assertEqual(
+            set(MpesaCallback.objects.values_list('status', flat=True)), {'rejected'}
+        )
+        self.assertEqual(set(TokenPurchase.objects.values_list('status', flat=True)), {'failed'})
+
+    def test_callback_for_settled_purchase_is_rejected(self):
+        self.purchase('ws_CO_1')
+        record_callback(stk_callback('ws_CO_1'))
+        process_batch()
+        TokenPurchase.objects.filter(checkout_request_id='ws_CO_1').update(status='failed')
+        MpesaCallback.objects.update(status='pending')
+
+        process_batch()
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.token_balance, 50)
+        self.assertEqual(MpesaCallback.objects.get().status, 'rejected')
+
+    def test_sharded_workers_cover_every_callback(self):
+        self.purchase('ws_CO_1')
+        record_callback(stk_callback('ws_CO_1'))
+        shard = self.vendor.pk % 3
+        self.assertEqual(process_batch(worker=(shard + 1) % 3, workers=3), 0)
+        self.assertEqual(process_batch(worker=shard, workers=3), 1)
+
+    def test_unmatched_callbacks_become_orphans(self):
+        record_callback(stk_callback('ws_CO_unknown'))
+        self.assertEqual(process_batch(), 0)
+        self.assertEqual(mark_orphans(), 0)
+
+        MpesaCallback.objects.update(received_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(mark_orphans(), 1)
+        self.assertEqual(MpesaCallback.objects.get().status, 'orphaned')
+
+
+class CallbackViewTests(TestCase):
+    def post(self, token, body, **extra):
+        return self.client.post(
+            reverse('payments:mpesa_callback', kwargs={'token': token}),
+            json.dumps(body),
+            content_type='application/json',
+            **extra,
+        )
+
+    @override_settings(MPESA_CALLBACK_TOKEN='s3cret', MPESA_CALLBACK_ALLOWED_IPS=[])
+    def test_accepts_valid_callback_with_token(self):
+        response = self.post('s3cret', stk_callback('ws_CO_1'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['ResultCode'], 0)
+        self.assertTrue(MpesaCallback.objects.filter(checkout_request_id='ws_CO_1').exists())
+
+    @override_settings(MPESA_CALLBACK_TOKEN='s3cret', MPESA_CALLBACK_ALLOWED_IPS=[])
+    def test_rejects_wrong_token_and_malformed_body(self):
+        self.assertEqual(self.post('guess', stk_callback('ws_CO_1')).status_code, 403)
+        self.assertEqual(self.post('s3cret', {'Body': {}}).status_code, 400)
+        self.assertFalse(MpesaCallback.objects.exists())
+
+    @override_settings(MPESA_CALLBACK_TOKEN='', MPESA_CALLBACK_ALLOWED_IPS=[], DEBUG=True)
+    def test_fails_closed_without_configured_token(self):
+        self.assertEqual(self.post('anything', stk_callback('ws_CO_1')).status_code, 403)
+        self.assertFalse(MpesaCallback.objects.exists())
+
+    @override_settings(MPESA_CALLBACK_TOKEN='s3cret', MPESA_CALLBACK_ALLOWED_IPS=['196.201.214.200'])
+    def test_rejects_unlisted_ip(self):
+        self.assertEqual(self.post('s3cret', stk_callback('ws_CO_1')).status_code, 403)
+
+    @override_settings(
+        MPESA_CALLBACK_TOKEN='s3cret', MPESA_CALLBACK_ALLOWED_IPS=['196.201.214.200'], MPESA_CALLBACK_PROXY_COUNT=1
+    )
+    def test_allowlist_uses_the_proxy_forwarded_address(self):
+        proxy = {'REMOTE_ADDR': '10.0.0.1'}
+        self.assertEqual(self.post('s3cret', stk_callback('ws_CO_1'), **proxy).status_code, 403)
+        # A client-supplied entry left of the proxy's own is ignored
+        spoofed = {**proxy, 'HTTP_X_FORWARDED_FOR': '196.201.214.200, 203.0.113.9'}
+        self.assertEqual(self.post('s3cret', stk_callback('ws_CO_1'), **spoofed).status_code, 403)
+        forwarded = {**proxy, 'HTTP_X_FORWARDED_FOR': '203.0.113.9, 196.201.214.200'}
+        self.assertEqual(self.post('s3cret', stk_callback('ws_CO_1'), **forwarded).status_code, 200)
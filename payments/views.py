@@ -1,3 +1,59 @@
-from django.shortcuts import render
+import hmac
+import json
+import logging
 
-# Create your views here.
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from .mpesa import InvalidCallback, record_callback
+
+
+logger = logging.getLogger(__name__)
+
+
+def _client_ip(request):
+    """
+    Address of the caller. Behind MPESA_CALLBACK_PROXY_COUNT proxies it is
+    the X-Forwarded-For entry appended by the outermost one; entries left
+    of it are client supplied and cannot be trusted.
+    """
+    hops = settings.MPESA_CALLBACK_PROXY_COUNT
+    if not hops:
+        return request.META.get('REMOTE_ADDR')
+    forwarded = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+    if len(forwarded) < hops:
+        return None
+    return forwarded[-hops]
+
+
+def _authorised(request, token):
+    allowed_ips = settings.MPESA_CALLBACK_ALLOWED_IPS
+    if allowed_ips and _client_ip(request) not in allowed_ips:
+        return False
+    expected = settings.MPESA_CALLBACK_TOKEN
+    if not expected:
+        # Fail closed: without a token anyone could post a forged success
+        logger.error('MPESA_CALLBACK_TOKEN is not set; rejecting M-Pesa callback')
+        return False
+    return hmac.compare_digest(token.encode(), expected.encode())
+
+
+@csrf_exempt
+@require_POST
+def mpesa_callback(request, token):
+    """
+    STK push callback intake: verify, store once, acknowledge. Crediting
+    tokens happens in the process_mpesa_callbacks workers, so the provider
+    never waits on vendor row locks.
+    """
+    if not _authorised(request, token):
+        return JsonResponse({'ResultCode': 1, 'ResultDesc': 'Rejected'}, status=403)
+    try:
+        checkout_request_id = record_callback(json.loads(request.body))
+    except (ValueError, InvalidCallback) as exc:
+        logger.warning('Invalid M-Pesa callback: %s', exc)
+        return JsonResponse({'ResultCode': 1, 'ResultDesc': 'Invalid payload'}, status=400)
+    logger.debug('Stored M-Pesa callback %s', checkout_request_id)
+    return JsonResponse({'ResultCode': 0, 'ResultDesc': 'Accepted'})
@@ -0,0 +1,30 @@
+#vendors/exports.py
+# Reports vendors can download about their own shop
+import json
+
+from accounts.models import UserActivity
+from core.exports import CSVExport, register_export
+
+
+@register_export
+class VendorActivityExport(CSVExport):
+    """
+    Full activity history of a single vendor account
+    """
+    name = 'vendor_activity'
+    header = [
+        'timestamp', 'activity_type', 'description', 'ip_address',
+        'browser', 'os', 'device_type', 'metadata',
+    ]
+
+    def get_queryset(self):
+        return UserActivity.objects.filter(user_id=self.params['user_id']).select_related('ip_address', 'user_agent')
+
+    def row(self, activity):
+        agent = activity.user_agent
+        return [
+            activity.timestamp.isoformat(), activity.activity_type, activity.description,
+            activity.ip_address.address,
+            agent.browser if agent else '', agent.os if agent else '', agent.device_type if agent else '',
+            json.dumps(activity.metadata, separators=(',', ':')),
+        ]
@@ -1,3 +1,32 @@
-from django.test import TestCase
+from django.test import Client, TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from accounts.models import User
+from core.models import ExportJob
+
+
+class ActivityExportViewTests(TestCase):
+    def setUp(self):
+        self.vendor = User.objects.create_user(
+            username='vendor', email='vendor@example.com', phone_number='+254700000020',
+            user_type='vendor', password='pw-for-tests',
+        )
+        self.url = reverse('vendors:export_activity')
+
+    def test_get_streams_and_never_queues(self):
+        self.client.force_login(self.vendor)
+        response = self.client.get(self.url, {'background': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        self.assertFalse(ExportJob.objects.exists())
+
+    def test_post_queues_only_with_csrf_token(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.vendor)
+        self.assertEqual(client.post(self.url).status_code, 403)
+        self.assertFalse(ExportJob.objects.exists())
+
+        client.cookies['csrftoken'] = 'x' * 32
+        response = client.post(self.url, HTTP_X_CSRFTOKEN='x' * 32)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(ExportJob.objects.get().created_by, self.vendor)
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'vendors'
+
+urlpatterns = [
+    path('exports/activity/', views.export_activity, name='export_activity'),
+]
@@ -1,3 +1,20 @@
-from django.shortcuts import render
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponseForbidden, JsonResponse
+from django.views.decorators.http import require_http_methods
 
-# Create your views here.
+from core.exports import export_response, queue_export
+from .exports import VendorActivityExport
+
+
+@login_required
+@require_http_methods(['GET', 'POST'])
+def export_activity(request):
+    """Stream the signed-in vendor's activity history on GET; a (CSRF-protected) POST queues it"""
+    if request.user.user_type != 'vendor':
+        return HttpResponseForbidden('Only vendors can export activity history')
+
+    export = VendorActivityExport(user_id=request.user.pk)
+    if request.method == 'POST':
+        job = queue_export(export, request.user)
+        return JsonResponse({'job_id': job.pk, 'status': job.status}, status=202)
+    return export_response(request, export)